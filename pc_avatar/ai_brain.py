@@ -1,40 +1,52 @@
+import functools
+import hashlib
+import logging
 import os
 import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover - SDK import problems
-    OpenAI = None  # type: ignore
+_LOG = logging.getLogger(__name__)
 
+_HERE = Path(__file__).resolve().parent
+_ENV_FILES = tuple(
+    str(path) for path in (_HERE / ".env", _HERE.parent / ".env") if path.exists()
+)
+
+
+# [ \t] rather than \s: \s spans newlines, so an empty ``KEY=`` would swallow the next line
+_ENV_LINE_RE = re.compile(r"^[ \t]*(?P<k>[A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?P<v>[^\r\n]*?)[ \t]*\r?$", re.M)
 
-_ENV_LOCATIONS = [
-    Path(__file__).resolve().parent / ".env",
-    Path(__file__).resolve().parent.parent / ".env",
-]
+
+@functools.lru_cache(maxsize=None)
+def _parse_env_file(path: str) -> Dict[str, str]:
+    """Read a .env file once per process and return its key/value pairs."""
+
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    return {
+        match.group("k"): match.group("v").strip('"').strip("'")
+        for match in _ENV_LINE_RE.finditer(text)
+    }
 
 
 def _load_env_value(name: str, *, aliases: Iterable[str] | None = None) -> Optional[str]:
     candidates = [name, *(aliases or [])]
-    for env_path in _ENV_LOCATIONS:
-        if not env_path.exists():
-            continue
-        try:
-            for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-                line = raw_line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                for variant in candidates:
-                    if not line.startswith(variant):
-                        continue
-                    _, _, value = line.partition("=")
-                    value = value.strip().strip('"').strip("'")
-                    os.environ[variant] = value
-                    if value:
-                        return value
-        except OSError:
-            continue
+    for env_path in _ENV_FILES:
+        parsed = _parse_env_file(env_path)
+        for variant in candidates:
+            if variant not in parsed:
+                continue
+            value = parsed[variant]
+            os.environ[variant] = value
+            if value:
+                return value
 
     for variant in candidates:
         direct = os.getenv(variant)
@@ -60,31 +72,208 @@ DEFAULT_MODEL = _first_present(
     "gpt-4.1-mini",
 )
 
-_OFFLINE = not _API_KEY or OpenAI is None
+_OFFLINE = not _API_KEY
+
+
+@functools.lru_cache(maxsize=1)
+def _build_http_client():
+    """Return a keep-alive httpx pool shared by every OpenAI request, or None."""
 
-if not _OFFLINE:
+    try:
+        import httpx
+    except Exception:  # pragma: no cover - optional transport tuning
+        return None
+    options = {
+        "timeout": httpx.Timeout(30.0, connect=5.0),
+        "limits": httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+    }
+    try:
+        return httpx.Client(http2=True, **options)
+    except ImportError:  # pragma: no cover - the h2 extra is not installed
+        return httpx.Client(**options)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """Import the OpenAI SDK and build the shared client on first online use.
+
+    Offline/demo runs never pay for importing openai, httpx, and pydantic.
+    """
+
+    if _OFFLINE:
+        return None
+    try:
+        from openai import OpenAI
+    except Exception:  # pragma: no cover - SDK import problems
+        return None
     client_kwargs = {"api_key": _API_KEY}
     if _PROJECT_ID:
         client_kwargs["project"] = _PROJECT_ID
+    http_client = _build_http_client()
+    if http_client is not None:
+        client_kwargs["http_client"] = http_client
     try:
-        _CLIENT = OpenAI(**client_kwargs)
+        return OpenAI(**client_kwargs)
     except Exception:  # pragma: no cover - client bootstrap failure
-        _CLIENT = None
-        _OFFLINE = True
-else:
-    _CLIENT = None
+        return None
+
+
+def warm_up_connection() -> None:
+    """Build the client and open a pooled TLS connection to the API host.
+
+    Meant for a background thread at startup, so the first reply skips the SDK
+    import and the TCP/TLS handshake. The HEAD request is unauthenticated
+    routing only and costs no tokens.
+    """
+
+    client = _get_client()
+    http_client = _build_http_client()
+    if client is None or http_client is None:
+        return
+    try:
+        http_client.head(str(client.base_url), timeout=5.0)
+    except Exception:  # pragma: no cover - offline at startup; the first reply retries
+        pass
+
 
+_ROLES = frozenset({"user", "assistant"})
 
 MAX_SENTENCES = 2
 MAX_SENTENCE_CHARS = 160
+RECENT_HISTORY_TURNS = 8
+# The history window's start advances in steps this size, so it holds 5-8 turns
+HISTORY_ANCHOR_STEP = RECENT_HISTORY_TURNS // 2
+
+# Server-side decode budgets; ~4 chars per token plus headroom for the reply cap above
+REPLY_MAX_TOKENS = MAX_SENTENCES * MAX_SENTENCE_CHARS // 4 + 16
+ELABORATE_MAX_TOKENS = 256
+SUMMARY_MAX_TOKENS = 180
+
+REPLY_CACHE_SIZE = 256
+
+
+def _parse_ttl(value: Optional[str], default: float) -> float:
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+REPLY_CACHE_TTL = _parse_ttl(_load_env_value("NOVA_REPLY_TTL"), 600.0)
+REPLY_DISK_CACHE_TTL = _parse_ttl(_load_env_value("NOVA_REPLY_DISK_TTL"), 86400.0)
+REPLY_DISK_CACHE_ROWS = 4096
+REPLY_DISK_CACHE_PATH = _HERE / "logs" / "reply_cache.sqlite3"
+SEMANTIC_CACHE_ENABLED = (_load_env_value("NOVA_SEMANTIC_CACHE") or "").lower() in {"1", "true", "yes", "on"}
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+# Answers about the current moment go stale immediately, so they are never cached
+_TEMPORAL_RE = re.compile(r"\b(?:time|now|today|tonight|tomorrow|yesterday)\b", re.I)
+
+# Coalescing window for replies requested at nearly the same time (0 disables batching)
+REPLY_BATCH_WINDOW = _parse_ttl(_load_env_value("NOVA_REPLY_BATCH_MS"), 0.0) / 1000.0
+REPLY_BATCH_SIZE = 4
+
+_REPLY_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_REPLY_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(messages: Sequence[dict]) -> str:
+    hasher = hashlib.blake2b(DEFAULT_MODEL.encode("utf-8", "ignore"), digest_size=16)
+    for message in messages:
+        hasher.update(f"\x1e{message['role']}\x1f{message['content']}".encode("utf-8", "ignore"))
+    return hasher.hexdigest()
+
+
+def _open_disk_cache() -> Optional[sqlite3.Connection]:
+    """Open the cross-session reply cache, dropping expired and overflow rows."""
+
+    if REPLY_DISK_CACHE_TTL <= 0:
+        return None
+    try:
+        REPLY_DISK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(REPLY_DISK_CACHE_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS replies (key TEXT PRIMARY KEY, text TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        conn.execute("DELETE FROM replies WHERE expires < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM replies WHERE key NOT IN (SELECT key FROM replies ORDER BY expires DESC LIMIT ?)",
+            (REPLY_DISK_CACHE_ROWS,),
+        )
+        return conn
+    except (OSError, sqlite3.Error):
+        return None
+
+
+_DISK_CACHE = None if _OFFLINE else _open_disk_cache()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _REPLY_CACHE_LOCK:
+        entry = _REPLY_CACHE.get(key)
+        if entry is not None:
+            stored_at, text = entry
+            if time.monotonic() - stored_at <= REPLY_CACHE_TTL:
+                _REPLY_CACHE.move_to_end(key)
+                return text
+            del _REPLY_CACHE[key]
+        if _DISK_CACHE is None:
+            return None
+        try:
+            row = _DISK_CACHE.execute(
+                "SELECT text FROM replies WHERE key = ? AND expires >= ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        _remember_in_memory(key, row[0])
+        return row[0]
+
+
+def _remember_in_memory(key: str, text: str) -> None:
+    if REPLY_CACHE_TTL <= 0:
+        return
+    _REPLY_CACHE[key] = (time.monotonic(), text)
+    _REPLY_CACHE.move_to_end(key)
+    while len(_REPLY_CACHE) > REPLY_CACHE_SIZE:
+        _REPLY_CACHE.popitem(last=False)
+
+
+def _cache_put(key: Optional[str], text: str) -> str:
+    if key is None:
+        return text
+    with _REPLY_CACHE_LOCK:
+        _remember_in_memory(key, text)
+        if _DISK_CACHE is not None:
+            try:
+                _DISK_CACHE.execute(
+                    "INSERT OR REPLACE INTO replies (key, text, expires) VALUES (?, ?, ?)",
+                    (key, text, time.time() + REPLY_DISK_CACHE_TTL),
+                )
+            except sqlite3.Error:
+                pass
+    return text
+
+
+_WS_RE = re.compile(r"\s+")
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_SENT_END_RE = re.compile(r"[.!?]\s")
+
+
+_DEFAULT_EMPTY_REPLY = "I am here. I listen."
 
 
 def _enforce_simple_sentences(text: str, max_sentences: int = MAX_SENTENCES) -> str:
-    cleaned = re.sub(r"\s+", " ", str(text)).strip()
+    cleaned = _WS_RE.sub(" ", str(text)).strip()
     if not cleaned:
-        return "I am here. I listen."
+        return _DEFAULT_EMPTY_REPLY
 
-    parts = re.split(r"(?<=[.!?])\s+", cleaned)
+    parts = _SENT_SPLIT_RE.split(cleaned)
     simple: List[str] = []
     for part in parts:
         fragment = part.strip().replace(";", ",")
@@ -99,11 +288,71 @@ def _enforce_simple_sentences(text: str, max_sentences: int = MAX_SENTENCES) ->
             break
 
     if not simple:
-        return "I am here. I listen."
+        return _DEFAULT_EMPTY_REPLY
 
     return " ".join(simple)
 
 
+# Fixed replies are simplified once here instead of on every error path
+_UNSURE_REPLY = _enforce_simple_sentences("I am not sure what to say.")
+_BAD_KEY_REPLY = _enforce_simple_sentences(
+    "OpenAI rejected the API key. Make a new key and update your settings."
+)
+_MISSING_PROJECT_REPLY = _enforce_simple_sentences(
+    "OpenAI needs a project ID with the key. Set OPENAI_PROJECT or OPENAI_PROJECT_ID."
+)
+
+
+_STABLE_SYSTEM_PROMPT = (
+    "You are Nova, an AI roommate who is casual but intelligent. "
+    "Speak naturally, like a friendly human roommate. "
+    "Keep every reply short—ideally one or two crisp sentences unless the user explicitly asks for detail. "
+    "Focus on the most recent user message and only mention older context when it clearly strengthens the answer. "
+    "If the user asks for help, stay concise and witty when appropriate."
+)
+_STABLE_SYSTEM_MESSAGE = {"role": "system", "content": _STABLE_SYSTEM_PROMPT}
+
+
+def _canonical_turns(history: Iterable[dict]) -> Iterator[dict]:
+    for item in history:
+        if not isinstance(item, dict):
+            continue
+        role = item.get("role")
+        content = item.get("content")
+        if role not in _ROLES or not isinstance(content, str):
+            continue
+        stripped = content.strip()
+        if stripped:
+            yield {"role": role, "content": stripped}
+
+
+def canonicalize_history(history: Optional[Iterable[dict]]) -> List[dict]:
+    """Return the usable user/assistant turns as fresh dicts with stripped content.
+
+    Everything downstream of the public entry points assumes this shape, so
+    each entry is validated and stripped exactly once per call.
+    """
+
+    if not history:
+        return []
+    return list(_canonical_turns(history))
+
+
+def _anchored_window(history: Sequence[dict], size: int, step: int) -> Sequence[dict]:
+    """Return at most the last ``size`` entries, with a start that only moves every ``step`` entries.
+
+    A sliding last-``size`` window changes the first history message on every
+    turn, so the provider's prompt-prefix cache never matches past the persona.
+    Holding the start still keeps consecutive prompts byte-identical up to the
+    newest turns, at the cost of sending as few as ``size - step + 1`` entries.
+    """
+
+    overflow = len(history) - size
+    if overflow <= 0:
+        return history
+    return history[-(-overflow // step) * step :]
+
+
 def _build_messages(
     user_text: str,
     screen_text: Optional[str],
@@ -111,43 +360,280 @@ def _build_messages(
     *,
     allow_elaboration: bool = False,
     memory_summary: Optional[str] = None,
+    validated: bool = False,
 ) -> List[dict]:
-    base_prompt = (
-        "You are Nova, an AI roommate who is casual but intelligent. "
-        "Speak naturally, like a friendly human roommate. "
-        "Keep every reply short—ideally one or two crisp sentences unless the user explicitly asks for detail. "
-        "Focus on the most recent user message and only mention older context when it clearly strengthens the answer. "
-        "If the user asks for help, stay concise and witty when appropriate."
-    )
-    if allow_elaboration:
-        base_prompt += " The user asked you to 'dive deeper', so provide a thorough answer while staying clear."
+    """Assemble the chat message list.
+
+    Pass ``validated=True`` when ``history`` already holds stripped
+    ``{"role", "content"}`` dicts with user/assistant roles only; the entries
+    are then appended as-is without per-item checks.
+    """
+    messages: List[dict] = [_STABLE_SYSTEM_MESSAGE]
+    # The memory summary only changes when main.py rotates it, so it belongs to the
+    # cacheable prefix: persona, memory, then history in order
     if memory_summary:
-        base_prompt += " Background memory (use only if relevant): " + memory_summary
-    system_prompt = {"role": "system", "content": base_prompt}
-    messages: List[dict] = [system_prompt]
+        messages.append({"role": "system", "content": "Background memory (use only if relevant): " + memory_summary})
     if history:
-        for item in history:
-            role = item.get("role") if isinstance(item, dict) else None
-            content = item.get("content") if isinstance(item, dict) else None
-            if role not in {"user", "assistant"}:
-                continue
-            if not isinstance(content, str) or not content.strip():
-                continue
-            messages.append({"role": role, "content": content.strip()})
+        messages.extend(history if validated else _canonical_turns(history))
+    # Per-call flags go after the history so the persona + history prefix stays byte-identical
+    if allow_elaboration:
+        messages.append(
+            {
+                "role": "system",
+                "content": "The user asked you to 'dive deeper', so provide a thorough answer while staying clear.",
+            }
+        )
     messages.append({"role": "user", "content": user_text})
     if screen_text:
         messages.append({"role": "system", "content": f"Screen context (for reference only): {screen_text[:320]}"})
     return messages
 
 
+_ROLE_LABELS = {"system": "System", "user": "User", "assistant": "Assistant"}
+
+
 def _messages_to_prompt(messages: List[dict]) -> str:
-    rendered: List[str] = []
-    for message in messages:
-        role = message.get("role", "user").capitalize()
-        content = message.get("content", "")
-        rendered.append(f"{role}: {content}")
-    rendered.append("Assistant:")
-    return "\n".join(rendered)
+    body = "\n".join(
+        f"{_ROLE_LABELS.get(role, role.capitalize())}: {message.get('content', '')}"
+        for message in messages
+        for role in (message.get("role", "user"),)
+    )
+    return body + "\nAssistant:" if body else "Assistant:"
+
+
+def _chat_completion(messages: List[dict], max_tokens: int = REPLY_MAX_TOKENS) -> str:
+    response = _get_client().chat.completions.create(
+        model=DEFAULT_MODEL,
+        messages=messages,
+        max_completion_tokens=max_tokens,
+    )
+    content = response.choices[0].message.content
+    return content.strip() if content else ""
+
+
+def _stream_completion(
+    messages: List[dict],
+    max_sentences: int = MAX_SENTENCES,
+    max_tokens: int = REPLY_MAX_TOKENS,
+) -> str:
+    """Stream a reply and stop as soon as enough sentences have arrived.
+
+    Replies are trimmed to ``max_sentences`` anyway, so tokens past that point
+    would only add latency and cost.
+    """
+
+    stream = _get_client().chat.completions.create(
+        model=DEFAULT_MODEL,
+        messages=messages,
+        max_completion_tokens=max_tokens,
+        stream=True,
+    )
+    buffer: List[str] = []
+    char_budget = max_sentences * MAX_SENTENCE_CHARS
+    size = 0
+    finished_sentences = 0
+    tail = ""
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buffer.append(delta)
+            size += len(delta)
+            # Only rescan the new text plus the previous last char for sentence ends
+            finished_sentences += len(_SENT_END_RE.findall(tail + delta))
+            tail = delta[-1]
+            if finished_sentences >= max_sentences or size >= char_budget:
+                break
+    finally:
+        stream.close()
+    return "".join(buffer).strip()
+
+
+_BATCH_ITEM_RE = re.compile(r"^\s*(\d+)\)\s*", re.M)
+
+
+class _PendingReply:
+    __slots__ = ("user_text", "messages", "done", "wake", "leader", "text", "error")
+
+    def __init__(self, user_text: str, messages: List[dict]) -> None:
+        self.user_text = user_text
+        self.messages = messages
+        self.done = threading.Event()
+        # Set once: when the reply is done, or when this caller is promoted to leader
+        self.wake = threading.Event()
+        self.leader = False
+        self.text = ""
+        self.error: Optional[BaseException] = None
+
+
+class _ReplyBatcher:
+    """Merge replies requested within a short window into one chat completion.
+
+    The first caller in a window becomes the leader: it waits for the window to
+    elapse (or the batch to fill), sends one numbered request for at most
+    ``max_size`` callers, and hands each its own answer. Callers beyond that are
+    left queued and the first of them leads the next batch. A lone caller, or a
+    batch whose prompts differ before the user turn, is sent unchanged.
+    """
+
+    def __init__(self, window: float, max_size: int) -> None:
+        self._window = window
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._pending: List[_PendingReply] = []
+
+    def submit(self, user_text: str, messages: List[dict]) -> str:
+        pending = _PendingReply(user_text, messages)
+        with self._lock:
+            self._pending.append(pending)
+            pending.leader = len(self._pending) == 1
+            if len(self._pending) >= self._max_size:
+                self._full.set()
+        if not pending.leader:
+            pending.wake.wait()
+        if not pending.done.is_set():
+            # Leaders sit at the head of the queue, so the batch below includes this caller
+            self._full.wait(self._window)
+            with self._lock:
+                batch = self._pending[: self._max_size]
+                del self._pending[: self._max_size]
+                if len(self._pending) < self._max_size:
+                    self._full.clear()
+                if self._pending:
+                    successor = self._pending[0]
+                    successor.leader = True
+                    successor.wake.set()
+            self._flush(batch)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.text
+
+    def _flush(self, batch: List[_PendingReply]) -> None:
+        try:
+            answers = self._answer_batch(batch) if len(batch) > 1 else None
+            if answers is None:
+                answers = [_chat_completion(item.messages) for item in batch]
+            for item, answer in zip(batch, answers):
+                item.text = answer
+        except BaseException as exc:  # hand the failure to every waiting caller
+            for item in batch:
+                item.error = exc
+        finally:
+            for item in batch:
+                item.done.set()
+                item.wake.set()
+
+    @staticmethod
+    def _answer_batch(batch: List[_PendingReply]) -> Optional[List[str]]:
+        # One merged prompt can only stand in for callers that share everything before
+        # their own user turn (persona, memory, history, flags) and end on that turn
+        context = batch[0].messages[:-1]
+        for item in batch:
+            if item.messages[-1]["role"] != "user" or item.messages[:-1] != context:
+                return None
+        context = list(context)
+        questions = "\n".join(f"{index}) {item.user_text}" for index, item in enumerate(batch, 1))
+        context.append(
+            {"role": "user", "content": "Answer each message separately, numbered:\n" + questions}
+        )
+        text = _chat_completion(context, max_tokens=REPLY_MAX_TOKENS * len(batch))
+        pieces = [piece.strip() for piece in _BATCH_ITEM_RE.split(text)]
+        numbered = dict(zip(pieces[1::2], pieces[2::2]))
+        answers = [numbered.get(str(index), "") for index in range(1, len(batch) + 1)]
+        if not all(answers):
+            return None
+        return answers
+
+
+_REPLY_BATCHER = _ReplyBatcher(REPLY_BATCH_WINDOW, REPLY_BATCH_SIZE) if REPLY_BATCH_WINDOW > 0 else None
+
+
+class _SemanticCache:
+    """Serve cached replies for near-duplicate utterances via local embeddings.
+
+    Vectors are normalized, so a matrix-vector product gives cosine similarity.
+    The store is capped at ``max_entries``, which keeps a flat scan cheap. Each
+    vector is stored with a digest of the prompt before the user turn, and only
+    entries with the same digest can match: "yes" or "why?" mean something else
+    under a different history or memory.
+    """
+
+    def __init__(self, model_cls, np_module, model_name: str, threshold: float, max_entries: int) -> None:
+        self._model_cls = model_cls
+        self._np = np_module
+        self._model_name = model_name
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._model = None
+        self._vectors = None
+        self._prefixes: List[str] = []
+        self._replies: List[str] = []
+        self._lock = threading.Lock()
+
+    def lookup(self, text: str, prefix: str):
+        """Return ``(reply or None, vector)``; pass the vector to :meth:`store` on a miss."""
+
+        with self._lock:
+            if self._model is None:
+                self._model = self._model_cls(self._model_name)
+            vector = self._model.encode([text], normalize_embeddings=True)[0].astype(self._np.float32)
+            if self._vectors is None:
+                return None, vector
+            same_context = self._np.fromiter(
+                (stored == prefix for stored in self._prefixes), dtype=bool, count=len(self._prefixes)
+            )
+            if not same_context.any():
+                return None, vector
+            similarities = self._np.where(same_context, self._vectors @ vector, -1.0)
+            best = int(similarities.argmax())
+            if similarities[best] >= self._threshold:
+                return self._replies[best], vector
+            return None, vector
+
+    def store(self, vector, prefix: str, reply: str) -> None:
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = vector[None, :]
+            else:
+                self._vectors = self._np.vstack([self._vectors, vector])[-self._max_entries :]
+            self._prefixes.append(prefix)
+            del self._prefixes[: -self._max_entries]
+            self._replies.append(reply)
+            del self._replies[: -self._max_entries]
+
+
+def _build_semantic_cache() -> Optional[_SemanticCache]:
+    if _OFFLINE or not SEMANTIC_CACHE_ENABLED:
+        return None
+    try:
+        import numpy
+        from sentence_transformers import SentenceTransformer
+    except Exception:  # pragma: no cover - optional semantic cache
+        return None
+    return _SemanticCache(
+        SentenceTransformer,
+        numpy,
+        SEMANTIC_CACHE_MODEL,
+        SEMANTIC_CACHE_THRESHOLD,
+        REPLY_CACHE_SIZE,
+    )
+
+
+_SEMANTIC_CACHE = _build_semantic_cache()
+
+
+def _semantic_lookup(user_text: str, prefix: str):
+    if _SEMANTIC_CACHE is None:
+        return None, None
+    try:
+        return _SEMANTIC_CACHE.lookup(user_text, prefix)
+    except Exception:  # model download or encode failure -> behave like a miss
+        return None, None
 
 
 def _fallback_summary(history: Sequence[dict]) -> Optional[str]:
@@ -155,14 +641,8 @@ def _fallback_summary(history: Sequence[dict]) -> Optional[str]:
         return None
     snippets: List[str] = []
     for entry in history[-6:]:
-        role = entry.get("role") if isinstance(entry, dict) else None
-        content = entry.get("content") if isinstance(entry, dict) else None
-        if role not in {"user", "assistant"}:
-            continue
-        if not isinstance(content, str) or not content.strip():
-            continue
-        prefix = "You" if role == "user" else "Nova"
-        snippet = content.strip()
+        prefix = "You" if entry["role"] == "user" else "Nova"
+        snippet = entry["content"]
         if len(snippet) > 140:
             snippet = snippet[:137].rstrip() + "…"
         snippets.append(f"- {prefix}: {snippet}")
@@ -171,72 +651,61 @@ def _fallback_summary(history: Sequence[dict]) -> Optional[str]:
     return "Recent highlights:\n" + "\n".join(snippets)
 
 
-def summarize_history(history: Sequence[dict]) -> Optional[str]:
-    if not history:
-        return None
-
+def _online_summary(history: Sequence[dict]) -> Optional[str]:
+    if _get_client() is None:
+        return _fallback_summary(history)
     messages = _build_messages(
         "Summarize our recent conversation into at most three concise bullet points focusing on decisions, tasks, or important facts.",
         None,
         history,
+        validated=True,
     )
 
-    if _OFFLINE or _CLIENT is None:
-        return _fallback_summary(history)
-
     try:
-        prompt = _messages_to_prompt(messages)
-        response = _CLIENT.responses.create(model=DEFAULT_MODEL, input=prompt)
-        text = getattr(response, "output_text", None)
+        cache_key = _cache_key(messages)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+        text = _chat_completion(messages, max_tokens=SUMMARY_MAX_TOKENS)
         if text:
-            return text.strip()
-
-        output = getattr(response, "output", None)
-        if output:
-            chunks = []
-            for item in output:
-                content_items = getattr(item, "content", None)
-                if not content_items:
-                    continue
-                for block in content_items:
-                    block_text = getattr(block, "text", None) or getattr(block, "value", None)
-                    if block_text:
-                        chunks.append(str(block_text))
-            if chunks:
-                return "".join(chunks).strip()
+            return _cache_put(cache_key, text)
     except Exception:
         pass
 
     return _fallback_summary(history)
 
 
-def generate_reply(
+def _offline_reply(
     user_text: str,
     screen_text: Optional[str] = None,
     history: Optional[Sequence[dict]] = None,
     *,
     memory_summary: Optional[str] = None,
 ) -> str:
-    """Get a reply from OpenAI when available; otherwise return a friendly local stub.
+    if screen_text:
+        offline = f"I am offline right now. You said: {user_text}, and I saw your screen."
+    else:
+        offline = f"I am offline right now. You said: {user_text}, and I did not see your screen."
+    return _enforce_simple_sentences(offline)
+
+
+def _reply_messages(
+    user_text: str,
+    screen_text: Optional[str],
+    history: Optional[Sequence[dict]],
+    memory_summary: Optional[str],
+) -> Tuple[List[dict], bool, Optional[str]]:
+    """Build the reply prompt; returns ``(messages, allow_elaboration, cache_key or None)``."""
 
-    This lets the app run in demo/offline mode without an API key.
-    """
     allow_elaboration = "dive deeper" in user_text.lower()
     if history:
-        filtered_history: List[dict] = []
-        for item in history:
-            if not isinstance(item, dict):
-                continue
-            role = item.get("role")
-            content = item.get("content")
-            if role not in {"user", "assistant"}:
-                continue
-            if not isinstance(content, str) or not content.strip():
-                continue
-            if memory_summary and content.strip() == memory_summary.strip():
-                continue
-            filtered_history.append({"role": role, "content": content.strip()})
-        recent_history: Optional[Sequence[dict]] = filtered_history[-8:]
+        memory_text = memory_summary.strip() if memory_summary else None
+        # The summary already sits in the prefix; drop its copy before choosing the
+        # window, so the limit and its anchor count only turns that are sent
+        usable = [turn for turn in _canonical_turns(history) if turn["content"] != memory_text]
+        recent_history: Optional[Sequence[dict]] = _anchored_window(
+            usable, RECENT_HISTORY_TURNS, HISTORY_ANCHOR_STEP
+        )
     else:
         recent_history = None
 
@@ -246,54 +715,116 @@ def generate_reply(
         recent_history,
         allow_elaboration=allow_elaboration,
         memory_summary=memory_summary,
+        validated=True,
     )
+    # "dive deeper" asks for a fresh, longer answer, so never serve it from cache either
+    cacheable = not allow_elaboration and not _TEMPORAL_RE.search(user_text)
+    return messages, allow_elaboration, _cache_key(messages) if cacheable else None
 
-    if _OFFLINE or _CLIENT is None:
-        if screen_text:
-            offline = f"I am offline right now. You said: {user_text}, and I saw your screen."
-        else:
-            offline = f"I am offline right now. You said: {user_text}, and I did not see your screen."
-        return _enforce_simple_sentences(offline)
+
+def _online_reply(
+    user_text: str,
+    screen_text: Optional[str] = None,
+    history: Optional[Sequence[dict]] = None,
+    *,
+    memory_summary: Optional[str] = None,
+) -> str:
+    if _get_client() is None:
+        return _offline_reply(user_text, screen_text, history, memory_summary=memory_summary)
+    messages, allow_elaboration, cache_key = _reply_messages(user_text, screen_text, history, memory_summary)
 
     try:
-        prompt = _messages_to_prompt(messages)
-        response = _CLIENT.responses.create(model=DEFAULT_MODEL, input=prompt)
-        text = getattr(response, "output_text", None)
+        if cache_key is not None:
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached
+        # Screen context changes what a good answer is, so only match bare utterances;
+        # without screen text the user turn is the last message, the rest is its context
+        semantic_prefix = _cache_key(messages[:-1]) if cache_key is not None and not screen_text else None
+        semantic_hit, semantic_vector = (
+            _semantic_lookup(user_text, semantic_prefix) if semantic_prefix is not None else (None, None)
+        )
+        if semantic_hit is not None:
+            # A near match is not this exact prompt; keep it out of the exact-match tiers
+            return semantic_hit
+        # Screen text follows the user turn, which a merged batch prompt cannot carry
+        if _REPLY_BATCHER is not None and not allow_elaboration and not screen_text:
+            text = _REPLY_BATCHER.submit(user_text, messages)
+        else:
+            text = _stream_completion(
+                messages,
+                max_tokens=ELABORATE_MAX_TOKENS if allow_elaboration else REPLY_MAX_TOKENS,
+            )
         if text:
-            return _enforce_simple_sentences(text.strip())
-
-        output = getattr(response, "output", None)
-        if output:
-            chunks = []
-            for item in output:
-                content_items = getattr(item, "content", None)
-                if not content_items:
-                    continue
-                for block in content_items:
-                    block_text = getattr(block, "text", None) or getattr(block, "value", None)
-                    if block_text:
-                        chunks.append(str(block_text))
-            if chunks:
-                return _enforce_simple_sentences("".join(chunks).strip())
-
-        # Fallback to legacy completions if the Responses API call shape isn't supported yet
-        legacy = _CLIENT.chat.completions.create(model=DEFAULT_MODEL, messages=messages)
-        return _enforce_simple_sentences(legacy.choices[0].message.content.strip())
+            reply = _enforce_simple_sentences(text)
+            if semantic_vector is not None:
+                # A cache failure must not turn a good reply into the "cannot reach" fallback
+                try:
+                    _SEMANTIC_CACHE.store(semantic_vector, semantic_prefix, reply)
+                except Exception:
+                    _LOG.warning("Semantic cache store failed", exc_info=True)
+            return _cache_put(cache_key, reply)
     except Exception as exc:
         # Network, auth, or model errors -> degrade gracefully
         message = str(exc)
         if "Incorrect API key" in message or "invalid_api_key" in message:
-            warning = (
-                "OpenAI rejected the API key. Make a new key and update your settings."
-            )
-            return _enforce_simple_sentences(warning)
+            return _BAD_KEY_REPLY
         if "project" in message and "missing" in message and not _PROJECT_ID:
-            warning = (
-                "OpenAI needs a project ID with the key. Set OPENAI_PROJECT or OPENAI_PROJECT_ID."
-            )
-            return _enforce_simple_sentences(warning)
+            return _MISSING_PROJECT_REPLY
         fallback = f"I cannot reach the AI service. You said: {user_text}."
         return _enforce_simple_sentences(fallback)
 
     # Ensure API success responses pass through the simplifier
-    return _enforce_simple_sentences("I am not sure what to say.")
\ No newline at end of file
+    return _UNSURE_REPLY
+
+
+# Whether an API key exists cannot change after import, so pick the code paths once
+_reply_impl = _offline_reply if _OFFLINE else _online_reply
+_summary_impl = _fallback_summary if _OFFLINE else _online_summary
+
+
+def summarize_history(history: Sequence[dict], *, validated: bool = False) -> Optional[str]:
+    """Condense the conversation into a short memory note.
+
+    Pass ``validated=True`` when ``history`` is already canonical (see
+    :func:`canonicalize_history`) to skip the per-entry checks.
+    """
+
+    turns = list(history) if validated else canonicalize_history(history)
+    if not turns:
+        return None
+    return _summary_impl(turns)
+
+
+def generate_reply(
+    user_text: str,
+    screen_text: Optional[str] = None,
+    history: Optional[Sequence[dict]] = None,
+    *,
+    memory_summary: Optional[str] = None,
+) -> str:
+    """Get a reply from OpenAI when available; otherwise return a friendly local stub.
+
+    This lets the app run in demo/offline mode without an API key.
+    """
+    return _reply_impl(user_text, screen_text, history, memory_summary=memory_summary)
+
+
+def peek_cached_reply(
+    user_text: str,
+    history: Optional[Sequence[dict]] = None,
+    *,
+    memory_summary: Optional[str] = None,
+) -> Optional[str]:
+    """Return the exact-match cached reply for a turn without screen context, if any.
+
+    Only the in-memory and SQLite tiers are probed (no network, no embedding
+    model), so this is cheap enough to call on the GUI thread before deciding
+    whether a worker is needed at all.
+    """
+
+    if _OFFLINE:
+        return None
+    _, _, cache_key = _reply_messages(user_text, None, history, memory_summary)
+    return _cache_get(cache_key) if cache_key is not None else None
+
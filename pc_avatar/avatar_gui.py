@@ -1,27 +1,31 @@
+import contextlib
+import hashlib
+import io
 import os
+import queue
 import random
 import tempfile
-from typing import Dict, List, Optional, Tuple
-
-import speech_recognition as sr
-from gtts import gTTS
-try:
-    import pyttsx3
-except Exception:  # pragma: no cover - optional dependency or platform issue
-    pyttsx3 = None  # type: ignore
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
 from PyQt5.QtCore import (
     QAbstractAnimation,
+    QBuffer,
+    QByteArray,
     QEasingCurve,
+    QIODevice,
     QPoint,
     QPropertyAnimation,
+    QRect,
     QSettings,
     QThread,
     QTimer,
-    QUrl,
     Qt,
     pyqtSignal,
 )
-from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QScreen
 from PyQt5.QtMultimedia import (
     QAudioOutputSelectorControl,
     QMediaContent,
@@ -46,97 +50,433 @@ from PyQt5.QtWidgets import (
 AUDIO_OUTPUT_CONTROL_IID = "org.qt-project.qt.audiooutputselectorcontrol/5.0"
 LISTEN_TIMEOUT_SENTINEL = "__LISTEN_TIMEOUT__"
 
+# "whisper" transcribes locally with faster-whisper when installed; anything else uses Google
+STT_BACKEND = os.environ.get("NOVA_STT_BACKEND", "whisper").strip().lower()
+STT_WHISPER_MODEL = os.environ.get("NOVA_WHISPER_MODEL", "base.en")
+
+TTS_LANGUAGE = "en"
+GTTS_TIMEOUT = (3.05, 5.0)  # (connect, read) seconds per gTTS request before falling back offline
+TTS_CACHE_MAX_FILES = 200
+UTTERANCE_CACHE_MAX = 64
+CHARACTER_SIZE = 220
+WORKER_STOP_TIMEOUT_MS = 2000
+DRAG_FRAME_FALLBACK_MS = 16
+_TTS_CACHE_DIR = os.path.join(tempfile.gettempdir(), "nova_tts")
+
+
+# Child widgets are styled by objectName; whitespace is collapsed once at import
+_AVATAR_QSS = " ".join(
+    """
+    QLabel#bubble {
+        background-color: rgba(24, 24, 32, 230);
+        color: white;
+        border-radius: 18px;
+        padding: 12px 16px;
+        border: 1px solid rgba(255, 255, 255, 0.18);
+    }
+    QPushButton#listenButton {
+        background-color: #4f46e5;
+        color: white;
+        border-radius: 16px;
+        padding: 10px 20px;
+        font-weight: 600;
+    }
+    QPushButton#listenButton:disabled {
+        background-color: rgba(255, 255, 255, 0.25);
+        color: rgba(255, 255, 255, 0.65);
+    }
+    QPushButton#settingsButton {
+        background-color: rgba(79, 70, 229, 0.22);
+        color: white;
+        border-radius: 20px;
+        font-size: 18px;
+    }
+    QPushButton#settingsButton:hover {
+        background-color: rgba(79, 70, 229, 0.35);
+    }
+    QPushButton#quitButton {
+        background-color: rgba(244, 63, 94, 0.85);
+        color: white;
+        border-radius: 20px;
+        font-size: 18px;
+    }
+    QPushButton#quitButton:hover {
+        background-color: rgba(244, 63, 94, 1.0);
+    }
+    """.split()
+)
+
+
+def _discard_file(path: str) -> None:
+    # Single unlink; a missing file is fine, so there is no exists() check to race
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+def _prepare_tts_cache() -> None:
+    """Create the synthesized-speech cache and keep only the newest files."""
+
+    try:
+        os.makedirs(_TTS_CACHE_DIR, exist_ok=True)
+        with os.scandir(_TTS_CACHE_DIR) as entries:
+            files = [entry for entry in entries if entry.is_file()]
+    except OSError:
+        return
+    if len(files) <= TTS_CACHE_MAX_FILES:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for stale in files[TTS_CACHE_MAX_FILES:]:
+        _discard_file(stale.path)
+
+
+def _tts_cache_path(text: str) -> str:
+    key = hashlib.blake2b(f"gtts:{TTS_LANGUAGE}:{text}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(_TTS_CACHE_DIR, key + ".mp3")
+
+
+def _read_cached_audio(text: str) -> Optional[bytes]:
+    try:
+        with open(_tts_cache_path(text), "rb") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def _store_cached_audio(text: str, data: bytes) -> None:
+    cached = _tts_cache_path(text)
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=_TTS_CACHE_DIR)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        # Rename into place so a half-written file is never served from the cache
+        os.replace(tmp_path, cached)
+    except OSError:
+        _discard_file(tmp_path)
+
+
+_prepare_tts_cache()
+
+_STOP_WORKER = object()
+
+
+@lru_cache(maxsize=1)
+def _load_pyttsx3():
+    # Imported on first use so the offline engine's driver setup stays off startup
+    try:
+        import pyttsx3
+    except Exception:  # pragma: no cover - optional dependency or platform issue
+        return None
+    return pyttsx3
+
+
+class _PersistentMicrophone:
+    """Wraps an ``sr.Microphone`` so PortAudio and its input stream stay open between listens.
 
-class VoiceThread(QThread):
-    """Background voice listener so the GUI thread stays responsive."""
+    Each ``with`` block only starts/stops the stream and yields the wrapped
+    microphone as the audio source; call ``close`` to release the device for good.
+    """
+
+    def __init__(self, device_index: Optional[int]) -> None:
+        import speech_recognition as sr
+
+        self.device_index = device_index
+        self._source = sr.Microphone(device_index=device_index)
+
+    def __enter__(self):
+        source = self._source
+        if source.audio is None:
+            source.audio = source.pyaudio_module.PyAudio()
+        if source.stream is None:
+            try:
+                source.stream = type(source).MicrophoneStream(
+                    source.audio.open(
+                        input_device_index=source.device_index,
+                        channels=1,
+                        format=source.format,
+                        rate=source.SAMPLE_RATE,
+                        frames_per_buffer=source.CHUNK,
+                        input=True,
+                    )
+                )
+            except Exception as exc:
+                self.close()
+                raise OSError(f"Could not open microphone: {exc}") from exc
+        elif source.stream.pyaudio_stream.is_stopped():
+            source.stream.pyaudio_stream.start_stream()
+        return source
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # A stopped stream stops buffering, so the next listen starts with fresh audio
+        stream = self._source.stream
+        try:
+            if stream is not None and not stream.pyaudio_stream.is_stopped():
+                stream.pyaudio_stream.stop_stream()
+        except Exception:
+            self.close()
+
+    def close(self) -> None:
+        source = self._source
+        try:
+            if source.stream is not None:
+                source.stream.close()
+        except Exception:  # pragma: no cover - device already gone
+            pass
+        finally:
+            source.stream = None
+            if source.audio is not None:
+                source.audio.terminate()
+                source.audio = None
+
+
+class VoiceWorker(QThread):
+    """Long-lived voice listener so the GUI thread stays responsive.
+
+    ``request_listen`` queues one capture; a request made while another is
+    pending or in flight is ignored. The worker keeps the microphone open and
+    remembers the ambient-noise threshold per device, so only the first listen
+    on a device pays for calibration. With ``STT_BACKEND == "whisper"`` the
+    model is loaded once at thread start and audio is transcribed locally;
+    Google is used if faster-whisper is unavailable.
+    """
 
     result = pyqtSignal(str)
     error = pyqtSignal(str)
 
     def __init__(
         self,
-        device_index: Optional[int],
     timeout: float = 8.0,
     phrase_time_limit: Optional[float] = None,
         parent: Optional[QWidget] = None,
     ) -> None:
         super().__init__(parent)
-        self._device_index = device_index
         self._timeout = timeout
         self._phrase_time_limit = phrase_time_limit
+        self._requests: "queue.Queue[object]" = queue.Queue()
+        self._busy = threading.Event()
+        self._microphone: Optional[_PersistentMicrophone] = None
+        self._energy_threshold: Optional[float] = None
+        self._whisper = None
+        self._numpy = None
+
+    def request_listen(self, device_index: Optional[int]) -> bool:
+        if self._busy.is_set():
+            return False
+        self._busy.set()
+        self._requests.put(device_index)
+        return True
+
+    def is_busy(self) -> bool:
+        return self._busy.is_set()
+
+    def stop(self) -> None:
+        self._requests.put(_STOP_WORKER)
 
     def run(self) -> None:  # type: ignore[override]
+        import speech_recognition as sr
+
         recognizer = sr.Recognizer()
         recognizer.dynamic_energy_threshold = True
         recognizer.pause_threshold = 2.0
         recognizer.non_speaking_duration = 0.7
+        if STT_BACKEND == "whisper":
+            self._load_whisper()
+        try:
+            while True:
+                device_index = self._requests.get()
+                if device_index is _STOP_WORKER:
+                    return
+                heard, payload = self._listen_once(recognizer, device_index)  # type: ignore[arg-type]
+                # Free the slot before reporting so the GUI can immediately listen again
+                self._busy.clear()
+                (self.result if heard else self.error).emit(payload)
+        finally:
+            self._close_microphone()
+
+    def _listen_once(self, recognizer, device_index: Optional[int]) -> Tuple[bool, str]:
+        import speech_recognition as sr
+
         try:
-            with sr.Microphone(device_index=self._device_index) as source:
+            microphone = self._microphone_for(device_index)
+            with microphone as source:
                 try:
-                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    audio = recognizer.listen(
-                        source,
-                        timeout=self._timeout,
-                        phrase_time_limit=self._phrase_time_limit,
-                    )
-                    text = recognizer.recognize_google(audio, language="en-US")
-                    self.result.emit(text)
+                    if self._energy_threshold is None:
+                        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    else:
+                        recognizer.energy_threshold = self._energy_threshold
+                    try:
+                        audio = recognizer.listen(
+                            source,
+                            timeout=self._timeout,
+                            phrase_time_limit=self._phrase_time_limit,
+                        )
+                    finally:
+                        # Carry the dynamically adapted threshold into the next listen
+                        self._energy_threshold = float(recognizer.energy_threshold)
+                    return True, self._transcribe(recognizer, audio)
                 except sr.WaitTimeoutError:
-                    self.error.emit(LISTEN_TIMEOUT_SENTINEL)
+                    return False, LISTEN_TIMEOUT_SENTINEL
                 except Exception as exc:  # pragma: no cover - speech errors at runtime
-                    self.error.emit(str(exc))
-        except OSError as exc:
-            self.error.emit(str(exc))
+                    return False, str(exc)
+        except Exception as exc:  # pragma: no cover - device errors at runtime
+            return False, str(exc)
 
+    def _load_whisper(self) -> None:
+        try:
+            import numpy
+            from faster_whisper import WhisperModel
+        except Exception:  # pragma: no cover - optional local transcription
+            return
+        try:
+            self._whisper = WhisperModel(STT_WHISPER_MODEL, device="auto", compute_type="int8")
+        except Exception:  # pragma: no cover - model download or runtime failure
+            return
+        self._numpy = numpy
+
+    def _transcribe(self, recognizer, audio) -> str:
+        if self._whisper is None:
+            return recognizer.recognize_google(audio, language="en-US")
+        raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        samples = self._numpy.frombuffer(raw, dtype=self._numpy.int16).astype(self._numpy.float32) / 32768.0
+        segments, _ = self._whisper.transcribe(samples, language="en", beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            # Match recognize_google, which raises when nothing intelligible was said
+            from speech_recognition import UnknownValueError
 
-class TTSThread(QThread):
-    """Generate TTS audio without blocking the UI thread."""
+            raise UnknownValueError()
+        return text
 
-    done = pyqtSignal(str)
-    error = pyqtSignal(str)
+    def _microphone_for(self, device_index: Optional[int]) -> _PersistentMicrophone:
+        if self._microphone is not None and self._microphone.device_index != device_index:
+            self._close_microphone()
+        if self._microphone is None:
+            self._microphone = _PersistentMicrophone(device_index=device_index)
+            self._energy_threshold = None
+        return self._microphone
+
+    def _close_microphone(self) -> None:
+        microphone, self._microphone = self._microphone, None
+        if microphone is not None:
+            microphone.close()
+
+
+class WarmupThread(QThread):
+    """Pay the speech stack's first-use costs before the user's first turn.
+
+    This is also where the deferred speech imports are first loaded.
+    """
+
+    def run(self) -> None:  # type: ignore[override]
+        try:
+            import speech_recognition as sr
+
+            recognizer = sr.Recognizer()
+            silence = sr.AudioData(b"\0" * 3200, 16000, 2)
+            recognizer.recognize_google(silence, show_all=True)
+        except Exception:  # pragma: no cover - offline or endpoint hiccups
+            pass
+        try:
+            from gtts import gTTS
+
+            gTTS("a", lang=TTS_LANGUAGE).write_to_fp(io.BytesIO())
+        except Exception:  # pragma: no cover - offline or endpoint hiccups
+            pass
+        pyttsx3 = _load_pyttsx3()
+        if pyttsx3 is not None:
+            try:
+                engine = pyttsx3.init()
+                engine.stop()
+            except Exception:  # pragma: no cover - platform-specific errors
+                pass
+
+
+class TTSWorker(QThread):
+    """Long-lived thread that turns text into encoded audio.
+
+    ``submit`` replaces any utterance still waiting in the queue, so a burst of
+    ``speak`` calls only synthesizes the latest one. ``done`` carries the text
+    together with its audio as ``bytes``; gTTS results are also persisted to the
+    disk cache. pyttsx3 is only used when gTTS errors or times out.
+    """
 
-    def __init__(self, text: str, parent: Optional[QWidget] = None) -> None:
+    done = pyqtSignal(str, object)
+    error = pyqtSignal(str, str)
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
-        self._text = text
+        self._jobs: "queue.Queue[object]" = queue.Queue()
+
+    def submit(self, text: str) -> None:
+        self._drain()
+        self._jobs.put(text)
+
+    def stop(self) -> None:
+        self._drain()
+        self._jobs.put(_STOP_WORKER)
 
     def run(self) -> None:  # type: ignore[override]
-        gtts_error: Optional[Exception] = None
+        while True:
+            text = self._jobs.get()
+            if text is _STOP_WORKER:
+                return
+            try:
+                data = self._synthesize(text)  # type: ignore[arg-type]
+            except Exception as exc:  # pragma: no cover - network / platform errors
+                self.error.emit(text, str(exc))
+            else:
+                self.done.emit(text, data)
+
+    def _drain(self) -> None:
         try:
-            path = self._generate_with_gtts(self._text)
-            self.done.emit(path)
-            return
-        except Exception as exc:  # pragma: no cover - network / IO errors
-            gtts_error = exc
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _synthesize(self, text: str) -> bytes:
+        cached = _read_cached_audio(text)
+        if cached is not None:
+            return cached
 
+        # Only one voice per utterance: the offline engine speaks only when Google fails
         try:
-            path = self._generate_with_pyttsx3(self._text)
-            self.done.emit(path)
-        except Exception as fallback_exc:  # pragma: no cover - platform-specific errors
-            parts = []
-            if gtts_error is not None:
-                parts.append(f"gTTS failed: {gtts_error}")
-            parts.append(f"Offline TTS failed: {fallback_exc}")
-            self.error.emit("; ".join(parts))
+            data = self._generate_with_gtts(text)
+        except Exception as gtts_exc:  # pragma: no cover - network errors / timeouts
+            try:
+                return self._generate_with_pyttsx3(text)
+            except Exception as offline_exc:
+                raise RuntimeError(f"gTTS failed: {gtts_exc}; Offline TTS failed: {offline_exc}") from offline_exc
+        _store_cached_audio(text, data)
+        return data
 
     @staticmethod
-    def _generate_with_gtts(text: str) -> str:
-        fd, tmp_path = tempfile.mkstemp(suffix=".mp3")
-        os.close(fd)
-        tts = gTTS(text)
-        tts.save(tmp_path)
-        return tmp_path
+    def _generate_with_gtts(text: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text, lang=TTS_LANGUAGE, timeout=GTTS_TIMEOUT).write_to_fp(buffer)
+        return buffer.getvalue()
 
     @staticmethod
-    def _generate_with_pyttsx3(text: str) -> str:
+    def _generate_with_pyttsx3(text: str) -> bytes:
+        pyttsx3 = _load_pyttsx3()
         if pyttsx3 is None:
             raise RuntimeError("pyttsx3 is not installed; run `pip install pyttsx3`")
+        # pyttsx3 can only render to a file, so read it back and drop it right away
         fd, tmp_path = tempfile.mkstemp(suffix=".wav")
         os.close(fd)
-        engine = pyttsx3.init()
-        engine.save_to_file(text, tmp_path)
-        engine.runAndWait()
-        engine.stop()
-        return tmp_path
+        try:
+            engine = pyttsx3.init()
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            engine.stop()
+            with open(tmp_path, "rb") as handle:
+                return handle.read()
+        finally:
+            _discard_file(tmp_path)
 
 
 class DeviceSettingsDialog(QDialog):
@@ -230,16 +570,21 @@ class Avatar(QWidget):
         self._mic_device_index: Optional[int] = None
         self._audio_output_id: Optional[str] = None
         self._pending_output_id: Optional[str] = None
+        self._audio_outputs_cache: Optional[List[Tuple[str, str]]] = None
         self._dragging = False
+        self._roaming = False
         self._drag_offset = QPoint()
         self._base_idle_text = "Hey, I'm Nova 👋"
-        self._current_tmp_path: Optional[str] = None
+        self._audio_buffer: Optional[QBuffer] = None
+        # Recently spoken text -> encoded audio, so repeats skip the TTS thread entirely
+        self._utterance_cache: "OrderedDict[str, bytes]" = OrderedDict()
         self._speech_text = ""
-        self._listening_thread: Optional[VoiceThread] = None
-        self._tts_thread: Optional[TTSThread] = None
+        self._warmup_thread: Optional[WarmupThread] = None
         self._pose = "idle"
         self._frame_index = 0
+        self._shown_pixmap: Optional[QPixmap] = None
         self._shutdown_flag = False
+        self._workers_stopped = False
         self._settings = QSettings("NovaProject", "Avatar")
         self._load_audio_preferences()
 
@@ -249,6 +594,7 @@ class Avatar(QWidget):
         self._setup_motion()
         self._setup_audio()
         self._apply_saved_audio_preferences()
+        QTimer.singleShot(0, self._start_warmup)
 
     # ------------------------------------------------------------------
     # Public surface
@@ -260,25 +606,21 @@ class Avatar(QWidget):
         self.show_message(text)
         self.listen_button.setEnabled(False)
         self._set_pose("talk")
-        self._tts_thread = TTSThread(text, self)
-        self._tts_thread.done.connect(self._on_tts_done)
-        self._tts_thread.error.connect(self._on_tts_error)
-        self._tts_thread.finished.connect(self._clear_tts_thread)
-        self._tts_thread.start()
+        cached_audio = self._utterance_cache.get(text)
+        if cached_audio is not None:
+            self._utterance_cache.move_to_end(text)
+            self._on_tts_done(text, cached_audio)
+            return
+        self._tts_worker.submit(text)
 
     def listen(self) -> None:
         if not self._mic_enabled:
             self.show_message("Microphone is disabled.")
             return
-        if self._listening_thread and self._listening_thread.isRunning():
+        if not self._voice_worker.request_listen(self._mic_device_index):
             return
         self.show_message("Listening…")
         self.listen_button.setEnabled(False)
-        self._listening_thread = VoiceThread(self._mic_device_index, parent=self)
-        self._listening_thread.result.connect(self._on_voice_result)
-        self._listening_thread.error.connect(self._on_voice_error)
-        self._listening_thread.finished.connect(self._clear_voice_thread)
-        self._listening_thread.start()
 
     def show_message(self, text: str) -> None:
         self.bubble_label.setText(text)
@@ -304,11 +646,13 @@ class Avatar(QWidget):
             self.show_message("Microphone enabled")
 
     def start_roaming(self) -> None:
-        if not self.roam_timer.isActive():
+        self._roaming = True
+        if self.isVisible() and not self.roam_timer.isActive():
             self.roam_timer.start()
         self._schedule_roam()
 
     def stop_roaming(self) -> None:
+        self._roaming = False
         self.roam_timer.stop()
         self.move_animation.stop()
         self._update_pose()
@@ -329,6 +673,8 @@ class Avatar(QWidget):
         self.resize(320, 380)
 
     def _setup_ui(self) -> None:
+        # One sheet for the whole widget, parsed once, instead of one per child
+        self.setStyleSheet(_AVATAR_QSS)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(22, 22, 22, 22)
         layout.setSpacing(12)
@@ -341,17 +687,7 @@ class Avatar(QWidget):
         self.bubble_label = QLabel(self._base_idle_text, self)
         self.bubble_label.setWordWrap(True)
         self.bubble_label.setAlignment(Qt.AlignCenter)
-        self.bubble_label.setStyleSheet(
-            """
-            QLabel {
-                background-color: rgba(24, 24, 32, 230);
-                color: white;
-                border-radius: 18px;
-                padding: 12px 16px;
-                border: 1px solid rgba(255, 255, 255, 0.18);
-            }
-            """
-        )
+        self.bubble_label.setObjectName("bubble")
         layout.addWidget(self.bubble_label, alignment=Qt.AlignCenter)
 
         button_row = QHBoxLayout()
@@ -360,59 +696,21 @@ class Avatar(QWidget):
 
         self.listen_button = QPushButton("🎙️ Talk to me", self)
         self.listen_button.setCursor(Qt.PointingHandCursor)
-        self.listen_button.setStyleSheet(
-            """
-            QPushButton {
-                background-color: #4f46e5;
-                color: white;
-                border-radius: 16px;
-                padding: 10px 20px;
-                font-weight: 600;
-            }
-            QPushButton:disabled {
-                background-color: rgba(255, 255, 255, 0.25);
-                color: rgba(255, 255, 255, 0.65);
-            }
-            """
-        )
+        self.listen_button.setObjectName("listenButton")
         self.listen_button.clicked.connect(self.listen)
         button_row.addWidget(self.listen_button)
 
         self.settings_button = QPushButton("⚙️", self)
         self.settings_button.setCursor(Qt.PointingHandCursor)
         self.settings_button.setFixedSize(40, 40)
-        self.settings_button.setStyleSheet(
-            """
-            QPushButton {
-                background-color: rgba(79, 70, 229, 0.22);
-                color: white;
-                border-radius: 20px;
-                font-size: 18px;
-            }
-            QPushButton:hover {
-                background-color: rgba(79, 70, 229, 0.35);
-            }
-            """
-        )
+        self.settings_button.setObjectName("settingsButton")
         self.settings_button.clicked.connect(self._open_settings_dialog)
         button_row.addWidget(self.settings_button)
 
         self.quit_button = QPushButton("⏻", self)
         self.quit_button.setCursor(Qt.PointingHandCursor)
         self.quit_button.setFixedSize(40, 40)
-        self.quit_button.setStyleSheet(
-            """
-            QPushButton {
-                background-color: rgba(244, 63, 94, 0.85);
-                color: white;
-                border-radius: 20px;
-                font-size: 18px;
-            }
-            QPushButton:hover {
-                background-color: rgba(244, 63, 94, 1.0);
-            }
-            """
-        )
+        self.quit_button.setObjectName("quitButton")
         self.quit_button.clicked.connect(self._request_shutdown)
         button_row.addWidget(self.quit_button)
 
@@ -420,15 +718,15 @@ class Avatar(QWidget):
         layout.addLayout(button_row)
 
     def _setup_animation(self) -> None:
-        self._frames: Dict[str, List[QPixmap]] = self._build_character_frames(220)
+        self._frames = _character_frames(CHARACTER_SIZE)
         self._pose = "idle"
         self._frame_index = 0
-        self.character_label.setPixmap(self._frames[self._pose][self._frame_index])
+        self._show_frame(self._frames[self._pose][self._frame_index])
 
         self._animation_timer = QTimer(self)
         self._animation_timer.setInterval(160)
         self._animation_timer.timeout.connect(self._advance_frame)
-        self._animation_timer.start()
+        self._sync_animation_timer()
 
     def _setup_motion(self) -> None:
         self.move_animation = QPropertyAnimation(self, b"pos", self)
@@ -437,14 +735,43 @@ class Avatar(QWidget):
         self.roam_timer = QTimer(self)
         self.roam_timer.setInterval(9000)
         self.roam_timer.timeout.connect(self._schedule_roam)
+        # Coalesces drag moves to one per display frame instead of one per mouse event
+        self._pending_drag_pos: Optional[QPoint] = None
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.setInterval(DRAG_FRAME_FALLBACK_MS)
+        self._drag_timer.timeout.connect(self._apply_drag_move)
+        # Geometry of the screen Nova last roamed on; refreshed on screen changes
+        self._roam_screen: Optional[QScreen] = None
+        self._roam_geometry: Optional[QRect] = None
+        app = QApplication.instance()
+        if app is not None:
+            app.screenAdded.connect(self._invalidate_roam_geometry)
+            app.screenRemoved.connect(self._invalidate_roam_geometry)
+            app.primaryScreenChanged.connect(self._invalidate_roam_geometry)
         QTimer.singleShot(1500, self.start_roaming)
 
     def _setup_audio(self) -> None:
         self.player = QMediaPlayer(self)
         self.player.setVolume(100)
         self.player.stateChanged.connect(self._on_player_state_changed)
-        _, active = self._get_audio_output_options()
-        self._audio_output_id = active
+        self._audio_output_id = self._active_audio_output()
+        # Full device enumeration is slow on WASAPI; warm the cache once the UI is up
+        QTimer.singleShot(0, self._refresh_audio_output_cache)
+
+        # One long-lived thread per role instead of a QThread per utterance
+        self._voice_worker = VoiceWorker(parent=self)
+        self._voice_worker.result.connect(self._on_voice_result, Qt.QueuedConnection)
+        self._voice_worker.error.connect(self._on_voice_error, Qt.QueuedConnection)
+        self._voice_worker.start()
+        self._tts_worker = TTSWorker(self)
+        self._tts_worker.done.connect(self._on_tts_done, Qt.QueuedConnection)
+        self._tts_worker.error.connect(self._on_tts_error, Qt.QueuedConnection)
+        self._tts_worker.start()
+        app = QApplication.instance()
+        if app is not None:
+            # main.py quits via QApplication.quit(), which never reaches closeEvent
+            app.aboutToQuit.connect(self._stop_workers)
 
     # ------------------------------------------------------------------
     # Events & interactions
@@ -467,10 +794,23 @@ class Avatar(QWidget):
         elif chosen == quit_action:
             self._request_shutdown()
 
+    def showEvent(self, event) -> None:  # type: ignore[override]
+        super().showEvent(event)
+        if self._roaming and not self.roam_timer.isActive():
+            self.roam_timer.start()
+        self._sync_animation_timer()
+
+    def hideEvent(self, event) -> None:  # type: ignore[override]
+        super().hideEvent(event)
+        # Nothing on screen to animate; avoid waking the event loop while hidden/minimized
+        self.roam_timer.stop()
+        self._animation_timer.stop()
+
     def mousePressEvent(self, event) -> None:  # type: ignore[override]
         if event.button() == Qt.LeftButton:
             self._dragging = True
             self._drag_offset = event.globalPos() - self.pos()
+            self._drag_timer.setInterval(self._frame_interval_ms())
             self.move_animation.stop()
             self._set_pose("walk")
             event.accept()
@@ -478,13 +818,17 @@ class Avatar(QWidget):
 
     def mouseMoveEvent(self, event) -> None:  # type: ignore[override]
         if self._dragging and event.buttons() & Qt.LeftButton:
-            self.move(event.globalPos() - self._drag_offset)
+            self._pending_drag_pos = event.globalPos() - self._drag_offset
+            if not self._drag_timer.isActive():
+                self._drag_timer.start()
             event.accept()
             return
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event) -> None:  # type: ignore[override]
         if event.button() == Qt.LeftButton and self._dragging:
+            self._drag_timer.stop()
+            self._apply_drag_move()
             self._dragging = False
             event.accept()
             self._update_pose()
@@ -497,6 +841,7 @@ class Avatar(QWidget):
             self._request_shutdown()
             return
         self._cleanup_audio()
+        self._stop_workers()
         super().closeEvent(event)
 
     # ------------------------------------------------------------------
@@ -505,6 +850,8 @@ class Avatar(QWidget):
     def _on_voice_result(self, text: str) -> None:
         self.show_message(f"You said: {text}")
         self.voice_captured.emit(text)
+        if self._mic_enabled and self.player.state() != QMediaPlayer.PlayingState:
+            self.listen_button.setEnabled(True)
 
     def _on_voice_error(self, err: str) -> None:
         if err == LISTEN_TIMEOUT_SENTINEL:
@@ -517,26 +864,41 @@ class Avatar(QWidget):
             self.listen_button.setEnabled(True)
         self._update_pose()
 
-    def _clear_voice_thread(self) -> None:
-        self._listening_thread = None
-        if self._mic_enabled and self.player.state() != QMediaPlayer.PlayingState:
-            self.listen_button.setEnabled(True)
-
-    def _on_tts_done(self, tmp_path: str) -> None:
-        self._current_tmp_path = tmp_path
-        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(tmp_path)))
+    def _on_tts_done(self, text: str, data: bytes) -> None:
+        self._remember_utterance(text, data)
+        if text != self._speech_text:
+            return  # superseded by a newer speak() while synthesizing
+        # Release the previous clip first; the stop it may trigger must not see the new buffer
+        self._cleanup_audio()
+        buffer = QBuffer(self)
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        self.player.setMedia(QMediaContent(), buffer)
+        self._audio_buffer = buffer
         self.player.play()
         self._set_pose("talk")
 
-    def _on_tts_error(self, err: str) -> None:
+    def _on_tts_error(self, text: str, err: str) -> None:
+        if text != self._speech_text:
+            return
         self.show_message(f"TTS error: {err}")
         if self._mic_enabled:
             self.listen_button.setEnabled(True)
         self._update_pose()
         self.response_finished.emit()
 
-    def _clear_tts_thread(self) -> None:
-        self._tts_thread = None
+    def _start_warmup(self) -> None:
+        if self._warmup_thread is not None:
+            return
+        self._warmup_thread = WarmupThread(self)
+        self._warmup_thread.finished.connect(self._clear_warmup_thread, Qt.QueuedConnection)
+        self._warmup_thread.start()
+
+    def _clear_warmup_thread(self) -> None:
+        thread, self._warmup_thread = self._warmup_thread, None
+        if thread is not None:
+            thread.finished.disconnect()
+            thread.deleteLater()
 
     def _on_player_state_changed(self, state: QMediaPlayer.State) -> None:
         if state == QMediaPlayer.PlayingState:
@@ -569,12 +931,11 @@ class Avatar(QWidget):
         if QApplication.instance() is None:
             return None
         center = self.pos() + QPoint(self.width() // 2, self.height() // 2)
-        screen = QApplication.screenAt(center)
-        if screen is None:
-            screen = QApplication.primaryScreen()
-        if screen is None:
-            return None
-        geom = screen.availableGeometry()
+        geom = self._roam_geometry
+        if geom is None or not geom.contains(center):
+            geom = self._refresh_roam_geometry(center)
+            if geom is None:
+                return None
         max_x = geom.right() - self.width()
         max_y = geom.bottom() - self.height()
         if max_x <= geom.left() or max_y <= geom.top():
@@ -583,6 +944,40 @@ class Avatar(QWidget):
         target_y = random.randint(geom.top(), max_y)
         return QPoint(target_x, target_y)
 
+    def _apply_drag_move(self) -> None:
+        if self._pending_drag_pos is not None:
+            self.move(self._pending_drag_pos)
+            self._pending_drag_pos = None
+
+    def _frame_interval_ms(self) -> int:
+        screen = self.screen()
+        rate = screen.refreshRate() if screen is not None else 0.0
+        if rate <= 0:
+            return DRAG_FRAME_FALLBACK_MS
+        return max(1, int(1000 / rate))
+
+    def _refresh_roam_geometry(self, center: QPoint) -> Optional[QRect]:
+        screen = QApplication.screenAt(center)
+        if screen is None:
+            screen = QApplication.primaryScreen()
+        if screen is None:
+            return None
+        if screen is not self._roam_screen:
+            self._invalidate_roam_geometry()
+            screen.availableGeometryChanged.connect(self._invalidate_roam_geometry)
+            self._roam_screen = screen
+        self._roam_geometry = screen.availableGeometry()
+        return self._roam_geometry
+
+    def _invalidate_roam_geometry(self, *_args) -> None:
+        if self._roam_screen is not None:
+            try:
+                self._roam_screen.availableGeometryChanged.disconnect(self._invalidate_roam_geometry)
+            except (RuntimeError, TypeError):
+                pass  # screen already destroyed
+        self._roam_screen = None
+        self._roam_geometry = None
+
     def _request_shutdown(self) -> None:
         if self._shutdown_flag:
             return
@@ -594,17 +989,36 @@ class Avatar(QWidget):
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def _stop_workers(self) -> None:
+        if self._workers_stopped:
+            return
+        self._workers_stopped = True
+        for worker in (self._voice_worker, self._tts_worker):
+            worker.stop()
+        for worker in (self._voice_worker, self._tts_worker):
+            # Bounded: a listen or synthesis in flight cannot be interrupted
+            worker.wait(WORKER_STOP_TIMEOUT_MS)
+
     def _cleanup_audio(self) -> None:
-        if self._current_tmp_path and os.path.exists(self._current_tmp_path):
-            try:
-                os.remove(self._current_tmp_path)
-            except OSError:
-                pass
-        self._current_tmp_path = None
+        buffer = self._audio_buffer
+        if buffer is None:
+            return
+        self._audio_buffer = None
+        self.player.setMedia(QMediaContent())
+        buffer.close()
+        buffer.deleteLater()
+
+    def _remember_utterance(self, text: str, data: bytes) -> None:
+        if not text:
+            return
+        self._utterance_cache[text] = data
+        self._utterance_cache.move_to_end(text)
+        while len(self._utterance_cache) > UTTERANCE_CACHE_MAX:
+            self._utterance_cache.popitem(last=False)
 
     def _open_settings_dialog(self) -> None:
         mic_names = self._safe_list_microphones()
-        outputs, active = self._get_audio_output_options()
+        outputs, active = self._audio_output_options()
         dialog = DeviceSettingsDialog(
             microphone_names=mic_names,
             current_mic_index=self._mic_device_index,
@@ -620,13 +1034,41 @@ class Avatar(QWidget):
             self._store_audio_preferences()
             self.show_message("Audio settings updated")
             self._update_pose()
+        # Re-enumerate once the dialog is gone, so the next open shows fresh devices
+        QTimer.singleShot(0, self._refresh_audio_output_cache)
 
     def _safe_list_microphones(self) -> List[str]:
         try:
+            import speech_recognition as sr
+
             return sr.Microphone.list_microphone_names()
         except Exception:
             return []
 
+    def _audio_output_options(self) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+        # The selector control lives on the GUI thread, so serve the device list from a
+        # cache refreshed after each dialog (stale-while-revalidate); only the cheap
+        # active-output query runs live
+        if self._audio_outputs_cache is None:
+            self._refresh_audio_output_cache()
+        return self._audio_outputs_cache or [], self._active_audio_output()
+
+    def _refresh_audio_output_cache(self) -> None:
+        self._audio_outputs_cache = self._get_audio_output_options()[0]
+
+    def _active_audio_output(self) -> Optional[str]:
+        service = self.player.service()
+        if service is None:
+            return None
+        control = service.requestControl(AUDIO_OUTPUT_CONTROL_IID)
+        if control is None:
+            return None
+        assert isinstance(control, QAudioOutputSelectorControl)
+        try:
+            return control.activeOutput()
+        finally:
+            service.releaseControl(control)
+
     def _get_audio_output_options(self) -> Tuple[List[Tuple[str, str]], Optional[str]]:
         service = self.player.service()
         if service is None:
@@ -706,11 +1148,8 @@ class Avatar(QWidget):
         frames = self._frames.get(self._pose)
         if not frames:
             return
-        if len(frames) == 1:
-            self.character_label.setPixmap(frames[0])
-            return
         self._frame_index = (self._frame_index + 1) % len(frames)
-        self.character_label.setPixmap(frames[self._frame_index])
+        self._show_frame(frames[self._frame_index])
 
     def _set_pose(self, pose: str) -> None:
         pose = pose if pose in self._frames else "idle"
@@ -718,7 +1157,23 @@ class Avatar(QWidget):
             return
         self._pose = pose
         self._frame_index = 0
-        self.character_label.setPixmap(self._frames[self._pose][self._frame_index])
+        self._show_frame(self._frames[self._pose][self._frame_index])
+        self._sync_animation_timer()
+
+    def _show_frame(self, pixmap: QPixmap) -> None:
+        # QLabel.setPixmap schedules a repaint even for the same pixmap
+        if pixmap is self._shown_pixmap:
+            return
+        self._shown_pixmap = pixmap
+        self.character_label.setPixmap(pixmap)
+
+    def _sync_animation_timer(self) -> None:
+        # Single-frame poses (idle) are static, so only tick while showing a multi-frame pose
+        if self.isVisible() and len(self._frames[self._pose]) > 1:
+            if not self._animation_timer.isActive():
+                self._animation_timer.start()
+        else:
+            self._animation_timer.stop()
 
     def _update_pose(self) -> None:
         if self.player.state() == QMediaPlayer.PlayingState:
@@ -728,9 +1183,10 @@ class Avatar(QWidget):
         else:
             self._set_pose("idle")
 
-    def _build_character_frames(self, size: int) -> Dict[str, List[QPixmap]]:
+    @staticmethod
+    def _build_character_frames(size: int) -> Dict[str, List[QPixmap]]:
         def build_frame(arm_phase: float, leg_phase: float, mouth_open: float) -> QPixmap:
-            return self._draw_character(size, arm_phase, leg_phase, mouth_open)
+            return Avatar._draw_character(size, arm_phase, leg_phase, mouth_open)
 
         walk_frames = [
             build_frame(arm_phase=0.9, leg_phase=-0.9, mouth_open=0.15),
@@ -751,161 +1207,267 @@ class Avatar(QWidget):
 
     @staticmethod
     def _draw_character(size: int, arm_phase: float, leg_phase: float, mouth_open: float) -> QPixmap:
+        # Layer order matters: the neck overlaps the bottom of the mouth
         pixmap = QPixmap(size, size)
         pixmap.fill(Qt.transparent)
         painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPixmap(0, 0, _draw_head_layer(size))
+        geometry = _sprite_geometry(size)
+        _draw_mouth(painter, geometry, mouth_open)
+        painter.drawPixmap(0, 0, _draw_torso_layer(size))
+        _draw_limbs(painter, geometry, arm_phase, leg_phase)
+        painter.end()
+        return pixmap
 
-        scale = size / 280.0
-        center_x = size / 2
-        head_radius = 42 * scale
-        head_center_y = 70 * scale
-        body_top = head_center_y + head_radius - 4 * scale
-        body_bottom = size - 40 * scale
-        shoulder_width = 42 * scale
-        hip_width = 34 * scale
-
-        skin_color = QColor(252, 231, 243)
-        hair_color = QColor(79, 70, 229)
-        outfit_color = QColor(56, 189, 248)
-        accent_color = QColor(14, 165, 233)
-
-        # Hair backdrop
-        painter.setBrush(hair_color)
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(
-            int(center_x - head_radius * 1.05),
-            int(head_center_y - head_radius * 1.05),
-            int(head_radius * 2.1),
-            int(head_radius * 2.05),
-        )
-
-        # Head
-        painter.setBrush(skin_color)
-        painter.drawEllipse(
-            int(center_x - head_radius),
-            int(head_center_y - head_radius),
-            int(head_radius * 2),
-            int(head_radius * 2),
-        )
-
-        # Eyes
-        eye_radius = 6.2 * scale
-        eye_offset_x = 16 * scale
-        eye_y = head_center_y + 6 * scale
-        painter.setBrush(Qt.white)
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(
-            int(center_x - eye_offset_x - eye_radius),
-            int(eye_y - eye_radius),
-            int(eye_radius * 2),
-            int(eye_radius * 2),
-        )
-        painter.drawEllipse(
-            int(center_x + eye_offset_x - eye_radius),
-            int(eye_y - eye_radius),
-            int(eye_radius * 2),
-            int(eye_radius * 2),
-        )
-
-        pupil_radius = 3.2 * scale
-        painter.setBrush(QColor(30, 41, 59))
-        painter.drawEllipse(
-            int(center_x - eye_offset_x - pupil_radius),
-            int(eye_y - pupil_radius),
-            int(pupil_radius * 2),
-            int(pupil_radius * 2),
-        )
-        painter.drawEllipse(
-            int(center_x + eye_offset_x - pupil_radius),
-            int(eye_y - pupil_radius),
-            int(pupil_radius * 2),
-            int(pupil_radius * 2),
-        )
 
-        # Mouth
-        mouth_width = 28 * scale
-        mouth_height = max(6 * scale, mouth_open * 28 * scale)
-        mouth_y = head_center_y + head_radius * 0.7
-        painter.setBrush(QColor(244, 114, 182))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(
-            int(center_x - mouth_width / 2),
-            int(mouth_y - mouth_height / 2),
-            int(mouth_width),
-            int(mouth_height),
-            8 * scale,
-            8 * scale,
-        )
+class _SpriteGeometry(NamedTuple):
+    scale: float
+    center_x: float
+    head_radius: float
+    head_center_y: float
+    body_top: float
+    body_bottom: float
+    # Frame-invariant parts of the mouth and limbs, already truncated where the
+    # renderer truncates, so per-frame work is only the phase-dependent math
+    mouth_x: int
+    mouth_width: int
+    mouth_y: float
+    mouth_min_height: float
+    mouth_radius: float
+    limb_width: float
+    left_shoulder_x: float
+    right_shoulder_x: float
+    shoulder_y: int
+    hand_y: int
+    left_hip_x: float
+    right_hip_x: float
+    hip_y: int
+    foot_y: int
+    arm_reach: float
+    leg_reach: float
+
+
+SKIN_COLOR = QColor(252, 231, 243)
+HAIR_COLOR = QColor(79, 70, 229)
+OUTFIT_COLOR = QColor(56, 189, 248)
+ACCENT_COLOR = QColor(14, 165, 233)
+
+
+@lru_cache(maxsize=8)
+def _sprite_geometry(size: int) -> _SpriteGeometry:
+    scale = size / 280.0
+    center_x = size / 2
+    head_radius = 42 * scale
+    head_center_y = 70 * scale
+    body_top = head_center_y + head_radius - 4 * scale
+    body_bottom = size - 40 * scale
+    mouth_width = 28 * scale
+    shoulder_width = 42 * scale
+    hip_width = 34 * scale
+    shoulder_y = body_top + 30 * scale
+    return _SpriteGeometry(
+        scale=scale,
+        center_x=center_x,
+        head_radius=head_radius,
+        head_center_y=head_center_y,
+        body_top=body_top,
+        body_bottom=body_bottom,
+        mouth_x=int(center_x - mouth_width / 2),
+        mouth_width=int(mouth_width),
+        mouth_y=head_center_y + head_radius * 0.7,
+        mouth_min_height=6 * scale,
+        mouth_radius=8 * scale,
+        limb_width=5 * scale,
+        left_shoulder_x=center_x - shoulder_width,
+        right_shoulder_x=center_x + shoulder_width,
+        shoulder_y=int(shoulder_y),
+        hand_y=int(shoulder_y + 68 * scale),
+        left_hip_x=center_x - hip_width,
+        right_hip_x=center_x + hip_width,
+        hip_y=int(body_bottom - 38 * scale),
+        foot_y=int(body_bottom + 12 * scale),
+        arm_reach=24 * scale,
+        leg_reach=26 * scale,
+    )
+
+
+def _begin_layer(size: int) -> Tuple[QPixmap, QPainter]:
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    return pixmap, painter
+
+
+@lru_cache(maxsize=8)
+def _draw_head_layer(size: int) -> QPixmap:
+    """Hair, head and eyes: identical in every frame."""
+
+    geo = _sprite_geometry(size)
+    scale, center_x = geo.scale, geo.center_x
+    head_radius, head_center_y = geo.head_radius, geo.head_center_y
+    eye_radius = 6.2 * scale
+    eye_offset_x = 16 * scale
+    eye_y = head_center_y + 6 * scale
+    pupil_radius = 3.2 * scale
+
+    def eye_pair(radius: float) -> List[QRect]:
+        return [
+            QRect(
+                int(center_x + offset - radius),
+                int(eye_y - radius),
+                int(radius * 2),
+                int(radius * 2),
+            )
+            for offset in (-eye_offset_x, eye_offset_x)
+        ]
 
-        # Neck
-        neck_width = 20 * scale
-        neck_height = 16 * scale
-        painter.setBrush(skin_color)
-        painter.drawRoundedRect(
-            int(center_x - neck_width / 2),
-            int(body_top - neck_height),
-            int(neck_width),
-            int(neck_height + 2 * scale),
-            6 * scale,
+    # Back-to-front, one brush change per color
+    ellipses: List[Tuple[QColor, List[QRect]]] = [
+        (
+            HAIR_COLOR,
+            [
+                QRect(
+                    int(center_x - head_radius * 1.05),
+                    int(head_center_y - head_radius * 1.05),
+                    int(head_radius * 2.1),
+                    int(head_radius * 2.05),
+                )
+            ],
+        ),
+        (
+            SKIN_COLOR,
+            [
+                QRect(
+                    int(center_x - head_radius),
+                    int(head_center_y - head_radius),
+                    int(head_radius * 2),
+                    int(head_radius * 2),
+                )
+            ],
+        ),
+        (QColor(Qt.white), eye_pair(eye_radius)),
+        (QColor(30, 41, 59), eye_pair(pupil_radius)),
+    ]
+
+    pixmap, painter = _begin_layer(size)
+    painter.setPen(Qt.NoPen)
+    for color, rects in ellipses:
+        painter.setBrush(color)
+        for rect in rects:
+            painter.drawEllipse(rect)
+    painter.end()
+    return pixmap
+
+
+@lru_cache(maxsize=8)
+def _draw_torso_layer(size: int) -> QPixmap:
+    """Neck, body and waist accent: identical in every frame."""
+
+    geo = _sprite_geometry(size)
+    scale, center_x = geo.scale, geo.center_x
+    body_top, body_bottom = geo.body_top, geo.body_bottom
+    neck_width = 20 * scale
+    neck_height = 16 * scale
+    body_width = 110 * scale
+
+    # (color, rect, corner radius), back-to-front
+    shapes: List[Tuple[QColor, QRect, float]] = [
+        (
+            SKIN_COLOR,
+            QRect(
+                int(center_x - neck_width / 2),
+                int(body_top - neck_height),
+                int(neck_width),
+                int(neck_height + 2 * scale),
+            ),
             6 * scale,
-        )
-
-        # Body / outfit
-        painter.setBrush(outfit_color)
-        painter.setPen(Qt.NoPen)
-        body_width = 110 * scale
-        painter.drawRoundedRect(
-            int(center_x - body_width / 2),
-            int(body_top),
-            int(body_width),
-            int(body_bottom - body_top - 10 * scale),
+        ),
+        (
+            OUTFIT_COLOR,
+            QRect(
+                int(center_x - body_width / 2),
+                int(body_top),
+                int(body_width),
+                int(body_bottom - body_top - 10 * scale),
+            ),
             26 * scale,
-            26 * scale,
-        )
-
-        # Waist accent
-        painter.setBrush(accent_color)
-        painter.drawRoundedRect(
-            int(center_x - body_width / 2),
-            int(body_bottom - 70 * scale),
-            int(body_width),
-            int(18 * scale),
+        ),
+        (
+            ACCENT_COLOR,
+            QRect(
+                int(center_x - body_width / 2),
+                int(body_bottom - 70 * scale),
+                int(body_width),
+                int(18 * scale),
+            ),
             14 * scale,
-            14 * scale,
-        )
-
-        pen = QPen(QColor(30, 64, 175))
-        pen.setWidthF(5 * scale)
-        pen.setCapStyle(Qt.RoundCap)
-        painter.setPen(pen)
-
-        shoulder_y = body_top + 30 * scale
-        hand_y = shoulder_y + 68 * scale
-        hip_y = body_bottom - 38 * scale
-        foot_y = body_bottom + 12 * scale
-
-        arm_swing = 24 * scale * arm_phase
-        leg_swing = 26 * scale * leg_phase
-
-        # Arms
-        left_shoulder = QPoint(int(center_x - shoulder_width), int(shoulder_y))
-        right_shoulder = QPoint(int(center_x + shoulder_width), int(shoulder_y))
-        left_hand = QPoint(int(center_x - shoulder_width - arm_swing), int(hand_y))
-        right_hand = QPoint(int(center_x + shoulder_width - arm_swing), int(hand_y))
-        painter.drawLine(left_shoulder, left_hand)
-        painter.drawLine(right_shoulder, right_hand)
-
-        # Legs
-        left_hip = QPoint(int(center_x - hip_width), int(hip_y))
-        right_hip = QPoint(int(center_x + hip_width), int(hip_y))
-        left_foot = QPoint(int(center_x - hip_width - leg_swing), int(foot_y))
-        right_foot = QPoint(int(center_x + hip_width - leg_swing), int(foot_y))
-        painter.drawLine(left_hip, left_foot)
-        painter.drawLine(right_hip, right_foot)
-
-        painter.end()
-        return pixmap
+        ),
+    ]
+
+    pixmap, painter = _begin_layer(size)
+    painter.setPen(Qt.NoPen)
+    for color, rect, radius in shapes:
+        painter.setBrush(color)
+        painter.drawRoundedRect(rect, radius, radius)
+    painter.end()
+    return pixmap
+
+
+def _draw_mouth(painter: QPainter, geo: _SpriteGeometry, mouth_open: float) -> None:
+    mouth_height = max(geo.mouth_min_height, mouth_open * 28 * geo.scale)
+    painter.setBrush(QColor(244, 114, 182))
+    painter.setPen(Qt.NoPen)
+    painter.drawRoundedRect(
+        geo.mouth_x,
+        int(geo.mouth_y - mouth_height / 2),
+        geo.mouth_width,
+        int(mouth_height),
+        geo.mouth_radius,
+        geo.mouth_radius,
+    )
+
+
+def _draw_limbs(painter: QPainter, geo: _SpriteGeometry, arm_phase: float, leg_phase: float) -> None:
+    pen = QPen(QColor(30, 64, 175))
+    pen.setWidthF(geo.limb_width)
+    pen.setCapStyle(Qt.RoundCap)
+    painter.setPen(pen)
+
+    arm_swing = geo.arm_reach * arm_phase
+    leg_swing = geo.leg_reach * leg_phase
+
+    # Arms
+    painter.drawLine(
+        QPoint(int(geo.left_shoulder_x), geo.shoulder_y),
+        QPoint(int(geo.left_shoulder_x - arm_swing), geo.hand_y),
+    )
+    painter.drawLine(
+        QPoint(int(geo.right_shoulder_x), geo.shoulder_y),
+        QPoint(int(geo.right_shoulder_x - arm_swing), geo.hand_y),
+    )
+
+    # Legs
+    painter.drawLine(
+        QPoint(int(geo.left_hip_x), geo.hip_y),
+        QPoint(int(geo.left_hip_x - leg_swing), geo.foot_y),
+    )
+    painter.drawLine(
+        QPoint(int(geo.right_hip_x), geo.hip_y),
+        QPoint(int(geo.right_hip_x - leg_swing), geo.foot_y),
+    )
+
+
+# Sprites are deterministic per size, so every Avatar shares one rasterized set
+_FRAME_CACHE: Dict[int, Dict[str, List[QPixmap]]] = {}
+
+
+def _character_frames(size: int) -> Dict[str, List[QPixmap]]:
+    frames = _FRAME_CACHE.get(size)
+    if frames is None:
+        frames = _FRAME_CACHE.setdefault(size, Avatar._build_character_frames(size))
+    return frames
 
 
 if __name__ == "__main__":
@@ -2,24 +2,41 @@
 
 from __future__ import annotations
 
-import hashlib
+import atexit
+import contextlib
 import json
+import logging
+import queue
 import re
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
-from typing import Any, Iterable, List, Mapping, MutableSequence, Sequence
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Mapping, MutableSequence, Sequence
 
 try:  # Python 3.9+
     from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 except ImportError:  # pragma: no cover - fallback for older interpreters
     from backports.zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # type: ignore
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional faster JSON codec
+    orjson = None
+
+_LOG = logging.getLogger(__name__)
+
 MAX_MESSAGES = 40  # keep the last 20 exchanges (user+assistant)
 
 LOGS_ROOT = Path(__file__).resolve().parent / "logs"
 CONTEXT_ROOT = LOGS_ROOT / "context"
 DEFAULT_CONTEXT_PATH = LOGS_ROOT / "conversation.json"
 DEFAULT_SEGMENT = "general"
+RAW_LOG_NAME = "raw.jsonl"
+WARM_STATE_SCHEMA = 1
+WARM_TAIL_MESSAGES = 6
 LEGACY_CONTEXT_PATH = Path(__file__).resolve().parent / "context.json"
 try:
     LOCAL_ZONE = ZoneInfo("Europe/Berlin")
@@ -27,8 +44,25 @@ except ZoneInfoNotFoundError:  # pragma: no cover - tzdata missing
     LOCAL_ZONE = timezone(timedelta(hours=2), name="UTC+02")
 
 
+# (epoch second, local datetime, ISO string) for the most recent clock read;
+# swapped as one tuple so the GUI and writer threads never see a torn update
+_clock: tuple[int, datetime, str] | None = None
+
+
+def _now_local() -> tuple[datetime, str]:
+    """Current local time at second precision, resolved against LOCAL_ZONE once per second."""
+
+    global _clock
+    second = int(time.time())
+    cached = _clock
+    if cached is None or cached[0] != second:
+        current = datetime.fromtimestamp(second, LOCAL_ZONE)
+        cached = _clock = (second, current, current.isoformat())
+    return cached[1], cached[2]
+
+
 def _utc_iso() -> str:
-    return datetime.now(LOCAL_ZONE).replace(microsecond=0).isoformat()
+    return _now_local()[1]
 
 
 def _ensure_log_dirs() -> None:
@@ -39,24 +73,28 @@ def _ensure_log_dirs() -> None:
         pass
 
 
+_HISTORY_ROLES = frozenset({"user", "assistant"})
+
+
 def _sanitize(messages: Iterable[dict]) -> List[dict]:
-    cleaned: List[dict] = []
-    for entry in messages:
-        if not isinstance(entry, dict):
-            continue
-        role = entry.get("role")
-        content = entry.get("content")
-        if role not in {"user", "assistant"}:
-            continue
-        if not isinstance(content, str) or not content.strip():
-            continue
-        cleaned.append({"role": role, "content": content.strip()})
-    return cleaned
+    # Single-element inner loops bind each lookup once; content is stripped only once
+    return [
+        {"role": role, "content": content}
+        for entry in messages
+        if isinstance(entry, dict)
+        for role in (entry.get("role"),)
+        if role in _HISTORY_ROLES
+        for raw in (entry.get("content"),)
+        if isinstance(raw, str)
+        for content in (raw.strip(),)
+        if content
+    ]
 
 
 _SEGMENT_SLUG_RE = re.compile(r"[^a-z0-9_-]+")
 
 
+@lru_cache(maxsize=256)
 def _segment_slug(segment: str) -> str:
     base = segment.strip().lower()
     base = base.replace(" ", "-")
@@ -65,6 +103,43 @@ def _segment_slug(segment: str) -> str:
     return base or "default"
 
 
+def _json_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON, via orjson when it is installed."""
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_JSON_SCALARS = (str, float, bool, type(None))
+_JSON_KEYS = (str, int, float, bool, type(None))
+
+
+def _is_jsonable(value: Any) -> bool:
+    """Type-check ``value`` against what both JSON encoders accept, without encoding it."""
+
+    if isinstance(value, _JSON_SCALARS):
+        return True
+    if isinstance(value, int):
+        # orjson only handles 64-bit integers
+        return -(1 << 63) <= value < (1 << 64)
+    if isinstance(value, (list, tuple)):
+        return all(_is_jsonable(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, _JSON_KEYS) and _is_jsonable(item) for key, item in value.items())
+    return False
+
+
 def _prepare_metadata(metadata: Mapping[str, Any] | None) -> dict[str, Any]:
     if not metadata:
         return {}
@@ -72,22 +147,23 @@ def _prepare_metadata(metadata: Mapping[str, Any] | None) -> dict[str, Any]:
     for key, value in metadata.items():
         if not isinstance(key, str):
             key = str(key)
-        try:
-            json.dumps(value)
-            prepared[key] = value
-        except TypeError:
-            prepared[key] = str(value)
+        prepared[key] = value if _is_jsonable(value) else str(value)
     return prepared
 
 
+def _jsonl_record(payload: Mapping[str, Any]) -> bytes:
+    return _json_bytes(payload) + b"\n"
+
+
+# Bullet and numbering characters; str.lstrip scans these in C, which beats a regex here
+_BULLET_PREFIX_CHARS = "-*0123456789. \t"
+
+
 def _extract_facts(summary: str) -> List[str]:
     facts: List[str] = []
     seen: set[str] = set()
     for line in summary.splitlines():
-        text = line.strip()
-        if not text:
-            continue
-        text = text.lstrip("-*0123456789. \t").strip()
+        text = line.strip().lstrip(_BULLET_PREFIX_CHARS).strip()
         if not text:
             continue
         key = text.lower()
@@ -98,19 +174,100 @@ def _extract_facts(summary: str) -> List[str]:
     return facts
 
 
+class _BackgroundWriter:
+    """Run segment file writes on one daemon thread, in submission order."""
+
+    def __init__(self) -> None:
+        self._jobs: "queue.Queue[tuple[Callable[..., None], tuple[Any, ...]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, func: Callable[..., None], *args: Any) -> None:
+        self._ensure_thread()
+        self._jobs.put((func, args))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything submitted so far is on disk (or ``timeout`` expires)."""
+
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._jobs.put((done.set, ()))
+        return done.wait(timeout)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="SegmentWriter", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            func, args = self._jobs.get()
+            try:
+                func(*args)
+            except Exception:  # pragma: no cover - a failed write must not stop later ones
+                pass
+
+
 class SegmentStore:
-    """Write conversation snippets into per-segment files for later retrieval."""
+    """Write conversation snippets into per-segment files for later retrieval.
+
+    Each segment keeps its messages as one JSON record per line in
+    ``raw/raw.jsonl``. Payloads (timestamps included) are built on the caller's
+    thread; the disk writes are handed to a background writer so
+    ``append_message`` never waits on I/O. Call ``flush`` before reading the
+    files back.
+    """
 
     def __init__(self, root: Path) -> None:
         self.root = root
+        self._writer = _BackgroundWriter()
+        self._dir_cache: Dict[str, tuple[str, Path]] = {}
+        # Writer-thread state: append handles per raw dir, and slugs whose
+        # directory and manifest are known to exist
+        self._raw_handles: Dict[Path, BinaryIO] = {}
+        self._ensured: set[str] = set()
+        # Slugs written since the last pop_changed(), for incremental vault exports
+        self._changed: set[str] = set()
+        self._changed_lock = threading.Lock()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return self._writer.flush(timeout)
+
+    def _mark_changed(self, slug: str) -> None:
+        with self._changed_lock:
+            self._changed.add(slug)
+
+    def pop_changed(self) -> set[str]:
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def close(self, timeout: float | None = None) -> None:
+        self._writer.submit(self._close_handles)
+        self._writer.flush(timeout)
+
+    def _close_handles(self) -> None:
+        handles, self._raw_handles = self._raw_handles, {}
+        for handle in handles.values():
+            try:
+                handle.close()
+            except OSError:
+                pass
 
     def _segment_dir(self, segment: str) -> tuple[str, Path]:
-        slug = _segment_slug(segment)
-        return slug, self.root / slug
+        cached = self._dir_cache.get(segment)
+        if cached is None:
+            slug = _segment_slug(segment)
+            cached = self._dir_cache[segment] = (slug, self.root / slug)
+        return cached
 
     def _ensure_manifest(self, seg_dir: Path, segment: str, slug: str) -> None:
-        manifest = seg_dir / "segment.json"
-        if manifest.exists():
+        if slug in self._ensured:
             return
         payload = {
             "segment": segment,
@@ -118,43 +275,67 @@ class SegmentStore:
             "created": _utc_iso(),
         }
         try:
-            manifest.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-        except OSError:
+            # Exclusive create instead of an exists() probe; keeps the original "created"
+            with open(seg_dir / "segment.json", "xb") as handle:
+                handle.write(_json_bytes(payload, indent=True))
+        except FileExistsError:
             pass
-
-    def record_raw(self, segment: str, role: str, content: str, metadata: Mapping[str, Any] | None = None) -> None:
-        slug, seg_dir = self._segment_dir(segment)
-        raw_dir = seg_dir / "raw"
-        try:
-            raw_dir.mkdir(parents=True, exist_ok=True)
         except OSError:
             return
+        self._ensured.add(slug)
 
-        timestamp = datetime.now(LOCAL_ZONE)
-        ts_iso = timestamp.replace(microsecond=0).isoformat()
-        ts_compact = timestamp.strftime("%Y%m%dT%H%M%S")
-        digest = hashlib.sha1(f"{role}:{ts_iso}:{content}".encode("utf-8", "ignore")).hexdigest()[:8]
-        filename = f"{ts_compact}_{role}_{digest}.json"
+    def record_raw(self, segment: str, role: str, content: str, metadata: Mapping[str, Any] | None = None) -> None:
+        slug, seg_dir = self._segment_dir(segment)
+        timestamp, ts_iso = _now_local()
+        # Same fields as ts_iso, without routing a second format string through strftime
+        ts_compact = (
+            f"{timestamp.year:04d}{timestamp.month:02d}{timestamp.day:02d}"
+            f"T{timestamp.hour:02d}{timestamp.minute:02d}{timestamp.second:02d}"
+        )
+        digest = blake2b(f"{role}:{ts_iso}:{content}".encode("utf-8", "ignore"), digest_size=4).hexdigest()
         payload: dict[str, Any] = {
+            "id": f"{ts_compact}_{role}_{digest}",
             "role": role,
             "content": content,
             "text": content,
             "ts": ts_iso,
+            # Lets readers skip ISO parsing and tz normalisation
+            "ts_epoch": int(timestamp.timestamp()),
             "segment": segment,
             "slug": slug,
         }
         meta_payload = _prepare_metadata(metadata)
         if meta_payload:
             payload["metadata"] = meta_payload
+        self._mark_changed(slug)
+        self._writer.submit(self._write_raw, seg_dir, segment, slug, payload)
+
+    def _write_raw(self, seg_dir: Path, segment: str, slug: str, payload: dict[str, Any]) -> None:
+        raw_dir = seg_dir / "raw"
         try:
-            (raw_dir / filename).write_text(
-                json.dumps(payload, indent=2, ensure_ascii=False),
-                encoding="utf-8",
-            )
+            handle = self._raw_handle(raw_dir)
+            handle.write(_jsonl_record(payload))
+            handle.flush()
         except OSError:
+            _LOG.warning("Dropped %s message for segment %s: raw log write failed", payload["role"], slug, exc_info=True)
+            handle = self._raw_handles.pop(raw_dir, None)
+            if handle is not None:
+                # Reopened on the next write; don't leak the descriptor meanwhile
+                with contextlib.suppress(OSError):
+                    handle.close()
             return
         self._ensure_manifest(seg_dir, segment, slug)
 
+    def _raw_handle(self, raw_dir: Path) -> BinaryIO:
+        handle = self._raw_handles.get(raw_dir)
+        if handle is None:
+            raw_dir.mkdir(parents=True, exist_ok=True)
+            # Older per-message *.json records stay where they are: readers take both
+            # them and the log, and rewriting them here would race the vault export
+            handle = open(raw_dir / RAW_LOG_NAME, "ab")
+            self._raw_handles[raw_dir] = handle
+        return handle
+
     def update_summary(
         self,
         segment: str,
@@ -166,12 +347,6 @@ class SegmentStore:
         if not summary.strip():
             return
         slug, seg_dir = self._segment_dir(segment)
-        try:
-            seg_dir.mkdir(parents=True, exist_ok=True)
-        except OSError:
-            return
-
-        summary_path = seg_dir / "summary.json"
         payload = {
             "segment": segment,
             "slug": slug,
@@ -179,8 +354,18 @@ class SegmentStore:
             "facts": list(facts),
             "updated": updated or _utc_iso(),
         }
+        self._mark_changed(slug)
+        self._writer.submit(self._write_summary, seg_dir, segment, slug, payload)
+
+    def _write_summary(self, seg_dir: Path, segment: str, slug: str, payload: dict[str, Any]) -> None:
+        if slug not in self._ensured:
+            try:
+                seg_dir.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                return
+        summary_path = seg_dir / "summary.json"
         try:
-            summary_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+            summary_path.write_bytes(_json_bytes(payload, indent=True))
         except OSError:
             pass
         self._ensure_manifest(seg_dir, segment, slug)
@@ -188,9 +373,61 @@ class SegmentStore:
 
 _ensure_log_dirs()
 _SEGMENT_STORE = SegmentStore(CONTEXT_ROOT)
+# The writer is a daemon thread; drain it so the last turns are not lost at exit
+atexit.register(_SEGMENT_STORE.close, 5.0)
+
+
+def flush_segment_writes(timeout: float | None = None) -> bool:
+    """Wait for queued segment writes to land; returns False on timeout."""
+
+    return _SEGMENT_STORE.flush(timeout)
+
+
+def pop_changed_segments() -> set[str]:
+    """Return (and forget) the segment folder names written since the previous call."""
+
+    return _SEGMENT_STORE.pop_changed()
+
+
+_TAIL_BLOCK = 8192
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_suffix(".jsonl")
+
+
+def _read_tail_records(path: Path, limit: int) -> List[Any]:
+    """Decode the last ``limit``-odd JSONL records without reading the whole file."""
+
+    with path.open("rb") as handle:
+        pos = handle.seek(0, 2)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= limit:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            handle.seek(pos)
+            data = handle.read(step) + data
+    lines = data.split(b"\n")
+    if pos > 0:
+        lines = lines[1:]  # first line is cut off mid-record
+    records: List[Any] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(_json_loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
 
 
 def load_context(path: Path = DEFAULT_CONTEXT_PATH) -> List[dict]:
+    sidecar = _sidecar_path(path)
+    try:
+        return _sanitize(_read_tail_records(sidecar, MAX_MESSAGES))[-MAX_MESSAGES:]
+    except OSError:
+        pass  # no sidecar yet: fall back to the JSON snapshot
+
     candidate_paths = []
     if path.exists():
         candidate_paths.append(path)
@@ -201,29 +438,73 @@ def load_context(path: Path = DEFAULT_CONTEXT_PATH) -> List[dict]:
 
     for candidate in candidate_paths:
         try:
-            data = json.loads(candidate.read_text(encoding="utf-8"))
+            data = _json_loads(candidate.read_bytes())
         except (OSError, json.JSONDecodeError):
             continue
         if isinstance(data, list):
             cleaned = _sanitize(data)[-MAX_MESSAGES:]
-            if candidate is LEGACY_CONTEXT_PATH and cleaned:
+            if cleaned:
+                # Seeds the sidecar so later appends extend this history
                 save_context(cleaned, path=path)
             return cleaned
     return []
 
 
+# Appends since the last save_context; the sidecar is compacted and the
+# JSON snapshot regenerated every MAX_MESSAGES appends and at exit
+_dirty = 0
+_unsaved: tuple[Sequence[dict], Path] | None = None
+_seeded_sidecars: set[Path] = set()
+
+
 def save_context(messages: Sequence[dict], path: Path = DEFAULT_CONTEXT_PATH) -> None:
+    """Rewrite both the bounded JSON snapshot and its append-only ``.jsonl`` sidecar."""
+
+    global _dirty, _unsaved
+    if _unsaved is not None and _unsaved[1] == path:
+        _dirty, _unsaved = 0, None
     cleaned = _sanitize(messages)[-MAX_MESSAGES:]
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
     except OSError:
         return
     try:
-        path.write_text(json.dumps(cleaned, indent=2, ensure_ascii=False), encoding="utf-8")
+        path.write_bytes(_json_bytes(cleaned, indent=True))
+        _sidecar_path(path).write_bytes(b"".join(_jsonl_record(entry) for entry in cleaned))
+    except OSError:
+        return
+    _seeded_sidecars.add(path)
+
+
+def write_context_snapshot(messages: Sequence[dict], path: Path = DEFAULT_CONTEXT_PATH) -> None:
+    """Rewrite only the bounded JSON snapshot; the sidecar keeps its appended lines.
+
+    The appends stay pending for the next :func:`save_context` compaction, so
+    this is safe to debounce per turn.
+    """
+
+    cleaned = _sanitize(messages)[-MAX_MESSAGES:]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_json_bytes(cleaned, indent=True))
     except OSError:
         pass
 
 
+def append_context_line(entry: Mapping[str, Any], path: Path = DEFAULT_CONTEXT_PATH) -> None:
+    """Append one message to the sidecar of ``path`` in O(1)."""
+
+    if path not in _seeded_sidecars and not _sidecar_path(path).exists():
+        # Carry an existing snapshot over before the first append lands
+        save_context(load_context(path), path=path)
+    try:
+        with _sidecar_path(path).open("ab") as handle:
+            handle.write(_jsonl_record(entry))
+    except OSError:
+        return
+    _seeded_sidecars.add(path)
+
+
 def append_message(
     history: MutableSequence[dict],
     role: str,
@@ -237,10 +518,59 @@ def append_message(
     entry = {"role": role, "content": content.strip()}
     history.append(entry)
     _SEGMENT_STORE.record_raw(segment or DEFAULT_SEGMENT, role, entry["content"], metadata=metadata)
-    if auto_save:
+    if not auto_save:
+        return
+    global _dirty, _unsaved
+    append_context_line(entry, path=path)
+    _dirty += 1
+    _unsaved = (history, path)
+    if _dirty >= MAX_MESSAGES:
         save_context(history, path=path)
 
 
+def flush_context() -> None:
+    """Regenerate the JSON snapshot (and compact the sidecar) after deferred appends."""
+
+    if _unsaved is not None:
+        save_context(*_unsaved)
+
+
+atexit.register(flush_context)
+
+
+def _warm_state_path(path: Path) -> Path:
+    return path.with_suffix(".warm.json")
+
+
+def save_warm_state(summary: str | None, history: Sequence[dict], path: Path = DEFAULT_CONTEXT_PATH) -> None:
+    """Persist the running memory summary plus the last few turns for the next launch."""
+
+    payload = {
+        "schema": WARM_STATE_SCHEMA,
+        "summary": summary,
+        "tail": _sanitize(history)[-WARM_TAIL_MESSAGES:],
+    }
+    try:
+        _warm_state_path(path).write_bytes(_json_bytes(payload, indent=True))
+    except OSError:
+        pass
+
+
+def load_warm_state(path: Path = DEFAULT_CONTEXT_PATH) -> tuple[str | None, List[dict]]:
+    """Return ``(summary, tail)`` saved by :func:`save_warm_state`; stale schemas load as empty."""
+
+    try:
+        data = _json_loads(_warm_state_path(path).read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return None, []
+    if not isinstance(data, dict) or data.get("schema") != WARM_STATE_SCHEMA:
+        return None, []
+    summary = data.get("summary")
+    summary = summary.strip() or None if isinstance(summary, str) else None
+    tail = data.get("tail")
+    return summary, _sanitize(tail) if isinstance(tail, list) else []
+
+
 def update_segment_summary(
     segment: str,
     summary: str,
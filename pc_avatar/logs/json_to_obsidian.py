@@ -4,9 +4,14 @@ from __future__ import annotations
 
 import hashlib
 import json
+import mmap
+import multiprocessing
+import os
 import re
 import shutil
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
@@ -16,25 +21,68 @@ try:
 except ImportError:  # pragma: no cover - for older Python
     from backports.zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # type: ignore
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional faster JSON codec
+    orjson = None
+
 BASE_DIR = Path(__file__).resolve().parent
 ROOT = BASE_DIR / "context"
 VAULT = BASE_DIR / "obsidian_vault"
+RAW_LOG_NAME = "raw.jsonl"
+# Below this much raw log, spawning worker processes costs more than the rebuild
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+NOTE_WRITE_WORKERS = 8
+MMAP_MIN_BYTES = 64 * 1024
 try:
     LOCAL_ZONE = ZoneInfo("Europe/Berlin")
 except ZoneInfoNotFoundError:  # pragma: no cover - tzdata missing
     LOCAL_ZONE = timezone(timedelta(hours=2), name="UTC+02")
 
 
+def _json_loads(data: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_json_file(path: "os.PathLike[str] | str") -> object:
+    """Decode a JSON file straight from bytes; large ones are mapped rather than copied."""
+
+    with open(path, "rb") as handle:
+        # stdlib json cannot decode a memoryview, so only orjson gets the mapping
+        if orjson is not None and os.fstat(handle.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+        return _json_loads(handle.read())
+
+
 def list_segments() -> List[str]:
     if not ROOT.exists():
         return []
     return sorted([p.name for p in ROOT.iterdir() if p.is_dir()])
 
 
+# Every non-word run, i.e. any mix of [-\s] and [^\w\s-]; see _safe_name_run
+_NON_WORD_RUN_RE = re.compile(r"\W+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _safe_name_run(match: "re.Match[str]") -> str:
+    # Equivalent to dropping [^\w\s-], strip(), then collapsing [-\s]+ to "-":
+    # a run keeps one dash if it has one, or if it has whitespace and is not at an edge
+    run = match.group()
+    if "-" in run:
+        return "-"
+    if match.start() == 0 or match.end() == len(match.string):
+        return ""
+    return "-" if any(ch.isspace() for ch in run) else ""
+
+
 def safe_filename(value: str) -> str:
     normalized = unicodedata.normalize("NFKD", value)
-    normalized = re.sub(r"[^\w\s-]", "", normalized).strip()
-    normalized = re.sub(r"[-\s]+", "-", normalized)
+    normalized = _NON_WORD_RUN_RE.sub(_safe_name_run, normalized)
     cleaned = normalized[:120]
     if cleaned:
         return cleaned
@@ -59,120 +107,151 @@ def read_summary(segment: str) -> Dict[str, object]:
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return _load_json_file(path)
     except Exception:
         return {}
 
 
 def collect_raw(segment: str) -> List[Tuple[str, Dict[str, object]]]:
     raw_dir = ROOT / segment / "raw"
-    if not raw_dir.exists():
-        return []
     collected: List[Tuple[str, Dict[str, object]]] = []
-    for raw_file in sorted(raw_dir.iterdir()):
-        if not raw_file.is_file():
-            continue
-        try:
-            payload = json.loads(raw_file.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        collected.append((raw_file.name, payload))
+    # Per-message files predate raw.jsonl and are kept alongside it.
+    # DirEntry caches the type from the listing, so this costs no stat per file.
+    try:
+        with os.scandir(raw_dir) as it:
+            legacy = [e for e in it if e.name.endswith(".json") and e.is_file(follow_symlinks=False)]
+    except OSError:
+        return collected
+    if legacy:
+        legacy.sort(key=lambda e: e.name)
+        for entry in legacy:
+            try:
+                payload = _load_json_file(entry.path)
+            except Exception:
+                continue
+            if isinstance(payload, dict):
+                collected.append((entry.name[: -len(".json")], payload))
+
+    legacy_ids = {item_id for item_id, _ in collected}
+    log_path = raw_dir / RAW_LOG_NAME
+    try:
+        handle = log_path.open("rb")
+    except OSError:
+        return collected
+    with handle:
+        # Binary lines split on b"\n" only; text-mode splitting would also break on U+2028
+        for line in handle:
+            try:
+                payload = _json_loads(line)
+            except Exception:
+                continue
+            if not isinstance(payload, dict):
+                continue
+            item_id = str(payload.get("id") or f"{RAW_LOG_NAME}:{len(collected)}")
+            # Earlier builds copied legacy files into the log under their stem; list them once
+            if item_id not in legacy_ids:
+                collected.append((item_id, payload))
     return collected
 
 
+_BOILERPLATE_LINES = frozenset(
+    {
+        "sure thing! here’s a quick summary:",
+        "sure thing! here's a quick summary:",
+        "let me know if you need anything else!",
+        "assistance ready: i’m here to help with coding questions or features you want to implement!",
+        "assistance ready: i'm here to help with coding questions or features you want to implement!",
+    }
+)
+
+
 def tidy_lines(lines: Iterable[str]) -> List[str]:
     seen: set[str] = set()
     cleaned_lines: List[str] = []
     for line in lines:
         raw = str(line).replace("**", "").replace("’", "'")
-        cleaned = re.sub(r"\s+", " ", raw).strip()
+        cleaned = _WHITESPACE_RE.sub(" ", raw).strip()
         if not cleaned:
             continue
         lower = cleaned.lower()
-        if lower in {
-            "sure thing! here’s a quick summary:",
-            "sure thing! here's a quick summary:",
-            "let me know if you need anything else!",
-            "assistance ready: i’m here to help with coding questions or features you want to implement!",
-            "assistance ready: i'm here to help with coding questions or features you want to implement!",
-        }:
+        if lower in _BOILERPLATE_LINES:
             continue
         if lower.endswith(":") and len(cleaned.split()) <= 6:
             continue
-        if lower.startswith("i'm here to help"):
-            continue
-        if lower.startswith("im here to help"):
+        if lower.startswith(("i'm here to help", "im here to help")):
             continue
-        if lower not in seen:
-            seen.add(lower)
+        # One hash probe: add() is a no-op for duplicates, so the size tells us
+        size = len(seen)
+        seen.add(lower)
+        if len(seen) != size:
             cleaned_lines.append(cleaned)
     return cleaned_lines
 
 
+_BULLET_PREFIX_CHARS = "-*•0123456789. \t"
+
+
 def bulletize(text: str) -> List[str]:
     raw_lines = []
     for line in text.splitlines():
-        cleaned = line.strip()
-        if not cleaned:
-            continue
-        cleaned = cleaned.lstrip("-*•0123456789. \t").strip()
+        cleaned = line.strip().lstrip(_BULLET_PREFIX_CHARS).strip()
         if cleaned:
             raw_lines.append(cleaned)
     return tidy_lines(raw_lines)
 
 
 SNIPPET_LIMIT = 68
-STOP_WORDS = {
-    "the",
-    "and",
-    "that",
-    "with",
-    "from",
-    "this",
-    "they",
-    "have",
-    "what",
-    "whats",
-    "lets",
-    "lets",
-    "your",
-    "about",
-    "into",
-    "there",
-    "some",
-    "like",
-    "just",
-    "you're",
-    "youre",
-    "going",
-    "over",
-    "here",
-    "want",
-    "need",
-    "really",
-    "sure",
-    "okay",
-    "cant",
-    "can't",
-    "were",
-    "we're",
-    "back",
-    "left",
-    "right",
-    "still",
-    "look",
-    "looks",
-    "it's",
-    "its",
-    "song",
-    "there's",
-    "theres",
-    "maybe",
-    "going",
-    "gonna",
-    "really",
-    "thing",
-}
+_TOKEN_RE = re.compile(r"[A-Za-z0-9']{3,}")
+STOP_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "that",
+        "with",
+        "from",
+        "this",
+        "they",
+        "have",
+        "what",
+        "whats",
+        "lets",
+        "your",
+        "about",
+        "into",
+        "there",
+        "some",
+        "like",
+        "just",
+        "you're",
+        "youre",
+        "going",
+        "over",
+        "here",
+        "want",
+        "need",
+        "really",
+        "sure",
+        "okay",
+        "cant",
+        "can't",
+        "were",
+        "we're",
+        "back",
+        "left",
+        "right",
+        "still",
+        "look",
+        "looks",
+        "it's",
+        "its",
+        "song",
+        "there's",
+        "theres",
+        "maybe",
+        "gonna",
+        "thing",
+    }
+)
 
 
 def first_line_snip(value: str, limit: int = SNIPPET_LIMIT) -> str:
@@ -184,14 +263,14 @@ def first_line_snip(value: str, limit: int = SNIPPET_LIMIT) -> str:
 
 
 def extract_keywords(text: str, limit: int = 5) -> List[str]:
-    tokens = re.findall(r"[A-Za-z0-9']{3,}", text.lower())
+    tokens = _TOKEN_RE.findall(text.lower())
     keywords: List[str] = []
     seen: set[str] = set()
     for token in tokens:
-        token_clean = token.replace("'", "")
-        if token_clean in STOP_WORDS:
+        # Tokens are ASCII [a-z0-9'] already, so dropping apostrophes leaves them alphanumeric
+        normalized = token.replace("'", "")
+        if normalized in STOP_WORDS:
             continue
-        normalized = re.sub(r"[^a-z0-9]", "", token_clean)
         if len(normalized) <= 3:
             continue
         if normalized in seen:
@@ -210,14 +289,14 @@ def prepare_raw_entries(
     entries: List[Dict[str, object]] = []
     for raw_name, payload in raw_items:
         text = str(payload.get("text") or payload.get("content") or "").strip()
-        iso, date_label, time_label = parse_timestamp(payload.get("ts"))
+        iso, date_label, time_label = parse_timestamp(payload.get("ts"), payload.get("ts_epoch"))
         role_value = str(payload.get("role") or "assistant").strip().lower()
         role_display = "User" if role_value == "user" else "Assistant"
         snippet = first_line_snip(text, 120)
         keywords = extract_keywords(text)
         keywords_line = ", ".join(keywords[:4])
         quick_summary = snippet
-        digest = hashlib.sha1(f"{raw_name}:{iso}:{text}".encode("utf-8", "ignore")).hexdigest()[:6]
+        digest = hashlib.blake2b(f"{raw_name}:{iso}:{text}".encode("utf-8", "ignore"), digest_size=3).hexdigest()
         file_stem = safe_filename(f"{date_label}-{time_label}-{role_display}-{digest}")
         note_title = f"{date_label} {time_label} {role_display}"
         alias = first_line_snip(f"{role_display}: {snippet}", 72)
@@ -243,7 +322,12 @@ def prepare_raw_entries(
     return entries
 
 
-def parse_timestamp(value: Optional[str]) -> Tuple[str, str, str]:
+def parse_timestamp(value: Optional[str], epoch: object = None) -> Tuple[str, str, str]:
+    if isinstance(epoch, int) and not isinstance(epoch, bool):
+        # record_raw stores whole epoch seconds alongside the ISO stamp
+        iso = datetime.fromtimestamp(epoch, LOCAL_ZONE).isoformat()
+        return iso, iso[:10], iso[11:16]
+
     if value:
         raw = str(value)
     else:
@@ -262,10 +346,10 @@ def parse_timestamp(value: Optional[str]) -> Tuple[str, str, str]:
     else:
         dt = datetime.now(LOCAL_ZONE)
 
-    dt = dt.astimezone(LOCAL_ZONE)
     iso = dt.replace(microsecond=0).isoformat()
-    date_label = dt.date().isoformat()
-    time_label = dt.strftime("%H:%M")
+    # isoformat() is fixed-width: YYYY-MM-DDTHH:MM:SS+HH:MM
+    date_label = iso[:10]
+    time_label = iso[11:16]
     return iso, date_label, time_label
 
 
@@ -295,118 +379,211 @@ def build_segment_notes(segment: str) -> Optional[str]:
     return summary_title
 
 
+def _summary_title(segment: str) -> str:
+    return f"{segment.replace('-', ' ').title()} Summary"
+
+
 def write_summary_note(
     segment: str,
     summary: Dict[str, object],
     entries: List[Dict[str, object]],
 ) -> str:
     display_segment = segment.replace("-", " ").title()
-    summary_title = f"{display_segment} Summary"
+    summary_title = _summary_title(segment)
     created = summary.get("updated") if isinstance(summary, dict) else None
     created_str, _, _ = parse_timestamp(str(created) if created else None)
 
     tags = [f"segment/{segment}", "summary"]
-    content = mkfront(summary_title, tags, created_str)
+    parts = [mkfront(summary_title, tags, created_str)]
 
     summary_text = "" if not isinstance(summary, dict) else str(summary.get("summary", ""))
     bullets = bulletize(summary_text)
     raw_facts = summary.get("facts") if isinstance(summary, dict) else None
     fact_lines = tidy_lines(raw_facts or []) if isinstance(raw_facts, list) else []
 
-    content += "## Snapshot\n\n"
+    parts.append("## Snapshot\n\n")
     if bullets:
-        for line in bullets:
-            content += f"- {line}\n"
+        parts.extend(f"- {line}\n" for line in bullets)
     else:
-        content += "- No summary captured yet.\n"
+        parts.append("- No summary captured yet.\n")
 
     if fact_lines and fact_lines != bullets:
-        content += "\n## Key facts\n\n"
-        for fact in fact_lines:
-            content += f"- {fact}\n"
+        parts.append("\n## Key facts\n\n")
+        parts.extend(f"- {fact}\n" for fact in fact_lines)
 
     if entries:
-        content += "\n## Recent notes\n\n"
+        parts.append("\n## Recent notes\n\n")
         for entry in entries:
             alias = entry["alias"]
             if entry["keywords_line"]:
                 detail = f"keywords: {entry['keywords_line']}"
             else:
                 detail = entry["quick_summary"]
-            content += (
+            parts.append(
                 f"- {entry['date']} {entry['time']} • {entry['role']}: [[{entry['link_path']}|{alias}]]"
                 f" — {detail}\n"
             )
 
-    content += "\n---\n"
-    content += f"Raw notes folder: [[{segment}/|Open {display_segment} notes]]\n"
+    parts.append("\n---\n")
+    parts.append(f"Raw notes folder: [[{segment}/|Open {display_segment} notes]]\n")
 
     summary_path = VAULT / f"{summary_title}.md"
-    summary_path.write_text(content, encoding="utf-8")
+    summary_path.write_text("".join(parts), encoding="utf-8")
     return summary_title
 
 
+# mkfront() header plus the raw-note body; optional sections are pre-rendered
+# into kw_line/meta_block (empty in the common case) so one format_map renders a note
+_RAW_NOTE_TEMPLATE = (
+    "---\n"
+    "title: {title}\n"
+    "tags: [{tags}]\n"
+    "created: {iso}\n"
+    "---\n"
+    "**Captured:** {date} {time} UTC\n"
+    "**Role:** {role}\n\n"
+    "## Summary\n\n"
+    "- Message: {role} — {quick_summary}\n"
+    "{kw_line}"
+    "\n## Message\n\n"
+    "{body}"
+    "{meta_block}"
+    "\n---\n"
+    "Segment summary: [[{summary_title}]]\n"
+    "Source file: {raw_name}\n"
+)
+
+
 def write_raw_notes(
     segment: str,
     summary_title: str,
     entries: List[Dict[str, object]],
 ) -> None:
     seg_dir = VAULT / segment
+    tags = f"segment/{segment}, raw"
+    notes: List[Tuple[Path, str]] = []
     for entry in entries:
-        filename = entry["file_stem"] + ".md"
-        tags = [f"segment/{segment}", "raw"]
-        content = mkfront(entry["note_title"], tags, entry["iso"])
-        content += f"**Captured:** {entry['date']} {entry['time']} UTC\n"
-        content += f"**Role:** {entry['role']}\n\n"
-
-        content += "## Summary\n\n"
-        content += f"- Message: {entry['role']} — {entry['quick_summary']}\n"
-        if entry["keywords"]:
-            content += f"- Keywords: {', '.join(entry['keywords'][:6])}\n"
-
-        content += "\n## Message\n\n"
-        if entry["text"]:
-            content += entry["text"] + "\n"
-        else:
-            content += "_No transcript text stored._\n"
+        keywords = entry["keywords"]
+        kw_line = f"- Keywords: {', '.join(keywords[:6])}\n" if keywords else ""
+        body = entry["text"] + "\n" if entry["text"] else "_No transcript text stored._\n"
 
         metadata = entry.get("metadata")
         if isinstance(metadata, dict) and metadata:
-            content += "\n## Metadata\n\n"
-            for key, value in metadata.items():
-                content += f"- **{key}:** {value}\n"
+            meta_lines = "".join(f"- **{key}:** {value}\n" for key, value in metadata.items())
+            meta_block = "\n## Metadata\n\n" + meta_lines
+        else:
+            meta_block = ""
+
+        content = _RAW_NOTE_TEMPLATE.format_map(
+            {
+                "title": entry["note_title"],
+                "tags": tags,
+                "iso": entry["iso"],
+                "date": entry["date"],
+                "time": entry["time"],
+                "role": entry["role"],
+                "quick_summary": entry["quick_summary"],
+                "kw_line": kw_line,
+                "body": body,
+                "meta_block": meta_block,
+                "summary_title": summary_title,
+                "raw_name": entry["raw_name"],
+            }
+        )
+        notes.append((seg_dir / (entry["file_stem"] + ".md"), content))
+
+    _write_notes(notes)
 
-        content += "\n---\n"
-        content += f"Segment summary: [[{summary_title}]]\n"
-        content += f"Source file: {entry['raw_name']}\n"
 
-        (seg_dir / filename).write_text(content, encoding="utf-8")
+def _write_note(note: Tuple[Path, str]) -> None:
+    note[0].write_text(note[1], encoding="utf-8")
+
+
+def _write_notes(notes: List[Tuple[Path, str]]) -> None:
+    """Write rendered notes, overlapping the per-file open/write/close round trips."""
+
+    if len(notes) < 2:
+        for note in notes:
+            _write_note(note)
+        return
+    with ThreadPoolExecutor(max_workers=min(NOTE_WRITE_WORKERS, len(notes))) as pool:
+        # Drain the iterator so the first failed write raises here, as the serial loop did
+        for _ in pool.map(_write_note, notes):
+            pass
+
+
+def _raw_log_bytes(segments: Sequence[str]) -> int:
+    total = 0
+    for segment in segments:
+        try:
+            total += (ROOT / segment / "raw" / RAW_LOG_NAME).stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def build_all_segments(segments: Sequence[str]) -> Dict[str, Optional[str]]:
+    """Build every segment's notes, fanning out to processes for large vaults."""
+
+    if len(segments) > 1 and _raw_log_bytes(segments) >= PARALLEL_MIN_BYTES:
+        workers = min(len(segments), os.cpu_count() or 1)
+        try:
+            # Segments only write inside their own vault folder, so they build independently.
+            # Always spawn: the app calls this from a worker thread of a multi-threaded Qt
+            # process, and a forked child could inherit locks held by the other threads
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                return dict(zip(segments, pool.map(build_segment_notes, segments)))
+        except (OSError, BrokenProcessPool):
+            pass  # e.g. frozen builds without multiprocessing support; rebuild serially
+    return {segment: build_segment_notes(segment) for segment in segments}
 
 
 def create_index(segments: Iterable[str], summaries: Dict[str, str]) -> None:
     index_path = VAULT / "Index.md"
-    content = "# Nova Context Index\n\n"
+    parts = ["# Nova Context Index\n\n"]
     if not segments:
-        content += "No segments found.\n"
+        parts.append("No segments found.\n")
     for segment in segments:
         summary_title = summaries.get(segment)
         display_segment = segment.replace("-", " ").title()
-        content += f"## {display_segment}\n\n"
+        parts.append(f"## {display_segment}\n\n")
         if summary_title:
-            content += f"- [[{summary_title}]]\n\n"
+            parts.append(f"- [[{summary_title}]]\n\n")
         else:
-            content += "- No summary note yet.\n\n"
-    index_path.write_text(content, encoding="utf-8")
+            parts.append("- No summary note yet.\n\n")
+    index_path.write_text("".join(parts), encoding="utf-8")
+
 
+def main(changed: Optional[Iterable[str]] = None) -> None:
+    """Rebuild the vault, or with ``changed`` only those segments' notes.
 
-def main() -> None:
+    ``None`` (the CLI default) rebuilds everything; an empty collection is a
+    no-op. Without an existing vault to patch, a partial request falls back to
+    the full rebuild.
+    """
+
+    if changed is not None:
+        changed = set(changed)
+        if not changed:
+            return
     segments = list_segments()
     print("Scanning context folder:", ROOT)
-    create_vault()
 
     summaries: Dict[str, str] = {}
-    for segment in segments:
-        summary_title = build_segment_notes(segment)
+    if changed is None or not (VAULT / "Index.md").exists():
+        create_vault()
+        built = build_all_segments(segments)
+    else:
+        rebuild = [segment for segment in segments if segment in changed]
+        for segment in rebuild:
+            # Drop notes of messages that are no longer in the segment's log
+            shutil.rmtree(VAULT / segment, ignore_errors=True)
+        built = build_all_segments(rebuild)
+        for segment in segments:
+            title = _summary_title(segment)
+            if segment not in built and (VAULT / f"{title}.md").exists():
+                summaries[segment] = title
+    for segment, summary_title in built.items():
         if summary_title:
             summaries[segment] = summary_title
 
@@ -1,73 +1,149 @@
 import os
+import queue
+import re
 import sys
 import threading
-from typing import Optional, Sequence
+from functools import partial
+from typing import Callable, List, Optional, Sequence
 
-from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, Qt, pyqtSignal
 from PyQt5.QtWidgets import QApplication
 
-BYE_KEYWORDS = {"bye", "bye nova"}
-STOP_KEYWORDS = {"stop", "stop nova"}
-
-SESSION_CONTROL_KEYWORDS = BYE_KEYWORDS | STOP_KEYWORDS | {"goodbye", "see you", "later nova"}
-SEGMENT_RULES = [
-    ("session-control", SESSION_CONTROL_KEYWORDS),
-    ("tasks", {"todo", "task", "remind", "schedule", "deadline", "plan"}),
-    ("work", {"project", "code", "bug", "deploy", "meeting", "client"}),
-    ("personal", {"family", "friend", "birthday", "relationship", "vacation", "hobby"}),
-    ("wellness", {"health", "doctor", "exercise", "sleep", "diet", "meditation"}),
-    ("finance", {"budget", "money", "invoice", "bill", "pay", "expense"}),
-]
+try:
+    import ahocorasick
+except Exception:  # pragma: no cover - optional C keyword matcher
+    ahocorasick = None
 
 if __package__ is None or __package__ == "":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from pc_avatar.ai_brain import generate_reply, summarize_history
+    from pc_avatar.ai_brain import generate_reply, peek_cached_reply, summarize_history, warm_up_connection
     from pc_avatar.avatar_gui import Avatar, LISTEN_TIMEOUT_SENTINEL
     from pc_avatar.context_store import (
         DEFAULT_CONTEXT_PATH,
         DEFAULT_SEGMENT,
         append_message,
+        flush_context,
+        flush_segment_writes,
         load_context,
+        load_warm_state,
+        pop_changed_segments,
         save_context,
+        save_warm_state,
         update_segment_summary,
+        write_context_snapshot,
     )
     from pc_avatar.logs import rebuild_obsidian_vault
     from pc_avatar.safety_toggle import SafetyToggle
-    from pc_avatar.screen_vision import get_screen_text, is_vision_ready
+    from pc_avatar.screen_vision import get_screen_text, is_vision_ready, refresh_vision, warm_up_ocr
+    from pc_avatar.session_commands import BYE_KEYWORDS, SESSION_CONTROL_KEYWORDS, STOP_KEYWORDS
 else:
-    from .ai_brain import generate_reply, summarize_history
+    from .ai_brain import generate_reply, peek_cached_reply, summarize_history, warm_up_connection
     from .avatar_gui import Avatar, LISTEN_TIMEOUT_SENTINEL
     from .context_store import (
         DEFAULT_CONTEXT_PATH,
         DEFAULT_SEGMENT,
         append_message,
+        flush_context,
+        flush_segment_writes,
         load_context,
+        load_warm_state,
+        pop_changed_segments,
         save_context,
+        save_warm_state,
         update_segment_summary,
+        write_context_snapshot,
     )
     from .logs import rebuild_obsidian_vault
     from .safety_toggle import SafetyToggle
-    from .screen_vision import get_screen_text, is_vision_ready
+    from .screen_vision import get_screen_text, is_vision_ready, refresh_vision, warm_up_ocr
+    from .session_commands import BYE_KEYWORDS, SESSION_CONTROL_KEYWORDS, STOP_KEYWORDS
 
 
-class ReplyThread(QThread):
-    """Runs the LLM + optional vision capture without blocking the UI."""
+def _keyword_alternation(words: set[str]) -> str:
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# One scan of the lowercased utterance: an exact bye/stop phrase, else a trailing
+# "bye"/"stop" word with any closing punctuation
+_COMMAND_RE = re.compile(
+    rf"\A(?:(?P<bye>{_keyword_alternation(BYE_KEYWORDS)})|(?P<stop>{_keyword_alternation(STOP_KEYWORDS)}))\Z"
+    r"|(?:\A|\s)(?P<tail>bye|stop)[.,!?;:\"']*\Z"
+)
+
+SEGMENT_RULES = [
+    ("session-control", SESSION_CONTROL_KEYWORDS),
+    ("tasks", {"todo", "task", "remind", "schedule", "deadline", "plan"}),
+    ("work", {"project", "code", "bug", "deploy", "meeting", "client"}),
+    ("personal", {"family", "friend", "birthday", "relationship", "vacation", "hobby"}),
+    ("wellness", {"health", "doctor", "exercise", "sleep", "diet", "meditation"}),
+    ("finance", {"budget", "money", "invoice", "bill", "pay", "expense"}),
+]
+
+
+def _compile_segment_matcher() -> Callable[[str], Optional[int]]:
+    """Return ``text -> index of the first SEGMENT_RULES entry with a keyword in text``.
+
+    All keywords are matched in one pass (an Aho-Corasick automaton when
+    pyahocorasick is installed, else one lookahead regex) instead of a substring
+    probe per keyword. Taking the minimum rule index over every hit keeps the
+    rule-order priority of the original nested loop.
+    """
+
+    keywords = [(keyword, index) for index, (_, words) in enumerate(SEGMENT_RULES) for keyword in sorted(words)]
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, index in keywords:
+            if keyword not in automaton:  # listed in rule order, so the first is the highest priority
+                automaton.add_word(keyword, index)
+        automaton.make_automaton()
+        return lambda text: min((index for _, index in automaton.iter(text)), default=None)
+
+    priority: dict[str, int] = {}
+    for keyword, index in keywords:
+        priority.setdefault(keyword, index)
+    # Zero-width lookahead reports overlapping hits; alternatives are in rule order,
+    # so each position yields its highest-priority keyword
+    pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword, _ in keywords) + "))")
+    return lambda text: min((priority[match.group(1)] for match in pattern.finditer(text)), default=None)
+
+
+_match_segment_rule = _compile_segment_matcher()
+
+
+REPLY_POOL_THREADS = 2
+CONTEXT_FLUSH_DELAY_MS = 500  # idle time before the turn's snapshot is rewritten
+_EXPORT_STOP = object()
+
+
+class ReplySignals(QObject):
+    """Signals for ``ReplyRunnable``; a QRunnable is not a QObject and cannot emit.
+
+    One instance lives on the controller and is shared by every job, so a turn
+    creates no QObject and makes no connections.
+    """
 
     result = pyqtSignal(str)
     error = pyqtSignal(str)
 
+
+class ReplyRunnable(QRunnable):
+    """Runs the LLM + optional vision capture on a pooled thread without blocking the UI."""
+
     def __init__(
         self,
+        signals: ReplySignals,
         user_text: str,
         include_screen: bool,
         history: Sequence[dict],
         memory_summary: Optional[str] = None,
-        parent: Optional[QObject] = None,
     ) -> None:
-        super().__init__(parent)
+        super().__init__()
+        # Left on auto-delete: the pool frees the job after run(), nothing holds it
+        self.signals = signals
         self._user_text = user_text
         self._include_screen = include_screen
-        self._history = list(history)
+        # tuple() of a tuple is the same object, so the controller's snapshot is not copied again
+        self._history = tuple(history)
         self._memory_summary = memory_summary
 
     def run(self) -> None:  # type: ignore[override]
@@ -79,9 +155,9 @@ class ReplyThread(QThread):
                 self._history,
                 memory_summary=self._memory_summary,
             )
-            self.result.emit(reply)
+            self.signals.result.emit(reply)
         except Exception as exc:  # network/vision errors are reported to the UI
-            self.error.emit(str(exc))
+            self.signals.error.emit(str(exc))
 
 
 class AppController(QObject):
@@ -97,13 +173,31 @@ class AppController(QObject):
         self._conversation = load_context(self._context_path)
         self._auto_listen_enabled = True
         self._last_segment = DEFAULT_SEGMENT
-        self._obsidian_thread = None
+        # One long-lived exporter; the single queue slot folds repeated triggers into one
+        # pending rebuild behind the one already running
+        self._export_queue: "queue.Queue[object]" = queue.Queue(maxsize=1)
+        # The first export of a session (and any after a failed one) rebuilds everything;
+        # the rest only rewrite segments that were written to since
+        self._vault_stale = True
+        self._export_thread = threading.Thread(target=self._export_loop, name="ObsidianExport", daemon=True)
+        self._export_thread.start()
         self._context_summary: Optional[str] = None
         if self._conversation and len(self._conversation) == 1:
             first_entry = self._conversation[0]
             content = first_entry.get("content") if isinstance(first_entry, dict) else None
             if isinstance(content, str) and content.count("\n") >= 1:
                 self._context_summary = content
+        warm_summary, warm_tail = load_warm_state(self._context_path)
+        # Turns that preceded the latest summary, kept for the next launch's warm state
+        self._recent_tail: List[dict] = list(warm_tail)
+        if warm_summary:
+            # Nothing was said since the last shutdown if the history is still just that
+            # summary; resume from the turns that preceded it instead
+            untouched = self._conversation == [{"role": "assistant", "content": warm_summary}]
+            if untouched and warm_tail:
+                self._conversation = warm_tail
+            if untouched or self._context_summary is None:
+                self._context_summary = warm_summary
 
         self.avatar.voice_captured.connect(self._handle_voice_text)
         self.avatar.voice_error.connect(self._handle_voice_error)
@@ -115,17 +209,46 @@ class AppController(QObject):
         self.avatar.reset_idle()
         self.avatar.show()
 
-        self._reply_thread = None
+        # Set while a job is queued or running; cleared when its result or error lands
+        self._reply_pending = False
+        self._reply_signals = ReplySignals(self)
+        # Emitted from the worker thread; queue explicitly rather than relying on auto-detection
+        self._reply_signals.result.connect(self._deliver_reply, Qt.QueuedConnection)
+        self._reply_signals.error.connect(self._handle_reply_error, Qt.QueuedConnection)
+        # Pooled threads outlive a turn, and the reply client's HTTP pool lives in ai_brain
+        self._pool = QThreadPool.globalInstance()
+        self._pool.setMaxThreadCount(REPLY_POOL_THREADS)
+        self._pool.setExpiryTimeout(-1)
         self._shutdown_in_progress = False
 
+        # Appends go straight to the O(1) sidecar; only the JSON snapshot is debounced,
+        # rewritten once per turn on a single-thread pool so snapshots land in order
+        self._context_dirty = False
+        self._io_pool = QThreadPool(self)
+        self._io_pool.setMaxThreadCount(1)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(CONTEXT_FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self._flush_context)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._save_pending_context)
+
+        # Cold starts (SDK import, TLS handshake, first Tesseract run) happen off the first turn
+        threading.Thread(target=self._warm_up, name="NovaWarmup", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        warm_up_connection()
+        if self.toggle.vision_enabled:
+            warm_up_ocr()
+
     # ------------------------------------------------------------------
     # Voice flow
     # ------------------------------------------------------------------
     def _infer_segment(self, role: str, content: str, *, include_screen: bool = False) -> str:
-        text = content.lower()
-        for segment, keywords in SEGMENT_RULES:
-            if any(keyword in text for keyword in keywords):
-                return segment
+        rule_index = _match_segment_rule(content.lower())
+        if rule_index is not None:
+            return SEGMENT_RULES[rule_index][0]
         if include_screen and role == "user":
             return "screen-context"
         return DEFAULT_SEGMENT
@@ -134,7 +257,7 @@ class AppController(QObject):
         if not text:
             self.avatar.reset_idle()
             return
-        if self._reply_thread and self._reply_thread.isRunning():
+        if self._reply_pending:
             self.avatar.show_message("Still thinking…")
             return
 
@@ -143,21 +266,10 @@ class AppController(QObject):
             self.avatar.reset_idle()
             return
 
-        text_lower = cleaned.lower()
-        last_word = ""
-        if cleaned:
-            parts = cleaned.split()
-            if parts:
-                candidate = parts[-1].rstrip(".,!?;:\"'")
-                last_word = candidate.lower()
-
+        command_match = _COMMAND_RE.search(cleaned.lower())
         command_type: Optional[str] = None
-        if text_lower in BYE_KEYWORDS:
-            command_type = "bye"
-        elif text_lower in STOP_KEYWORDS:
-            command_type = "stop"
-        elif last_word in {"bye", "stop"}:
-            command_type = last_word
+        if command_match is not None:
+            command_type = command_match.group("tail") or command_match.lastgroup
 
         if command_type is not None:
             self._auto_listen_enabled = False
@@ -175,17 +287,19 @@ class AppController(QObject):
                 auto_save=False,
                 segment=segment,
             )
-            self._summarize_and_trim(reply)
+            # Speak first: the TTS worker synthesizes the farewell while the summary
+            # round-trip below runs, instead of only after it
             self.avatar.speak(reply)
+            self._summarize_and_trim(reply)
             self._trigger_obsidian_export()
             return
 
         self._auto_listen_enabled = True
-        self.avatar.show_message("Thinking…")
         include_screen = self.toggle.vision_enabled and is_vision_ready()
         segment = self._infer_segment("user", cleaned, include_screen=include_screen)
         self._last_segment = segment
-        history_for_ai = list(self._conversation)
+        # Immutable snapshot: shared with the worker thread as-is, unaffected by later appends
+        history_for_ai = tuple(self._conversation)
         append_message(
             self._conversation,
             "user",
@@ -194,17 +308,24 @@ class AppController(QObject):
             segment=segment,
             metadata={"include_screen": include_screen},
         )
-        self._reply_thread = ReplyThread(
-            cleaned,
-            include_screen,
-            history_for_ai,
-            memory_summary=self._context_summary,
-            parent=self,
+        self._mark_context_dirty()
+        if not include_screen:
+            # A repeated question needs neither the worker thread nor the network
+            cached = peek_cached_reply(cleaned, history_for_ai, memory_summary=self._context_summary)
+            if cached:
+                self._deliver_reply(cached)
+                return
+        self.avatar.show_message("Thinking…")
+        self._reply_pending = True
+        self._pool.start(
+            ReplyRunnable(
+                self._reply_signals,
+                cleaned,
+                include_screen,
+                history_for_ai,
+                memory_summary=self._context_summary,
+            )
         )
-        self._reply_thread.result.connect(self._deliver_reply)
-        self._reply_thread.error.connect(self._handle_reply_error)
-        self._reply_thread.finished.connect(self._clear_reply_thread)
-        self._reply_thread.start()
 
     def _handle_voice_error(self, err: str) -> None:
         if not err or err == LISTEN_TIMEOUT_SENTINEL:
@@ -215,6 +336,8 @@ class AppController(QObject):
     # Reply lifecycle
     # ------------------------------------------------------------------
     def _deliver_reply(self, reply: str) -> None:
+        # Each job emits exactly one of result/error; clear before anything below checks it
+        self._reply_pending = False
         if reply:
             segment_guess = self._infer_segment("assistant", reply)
             segment = segment_guess if segment_guess != DEFAULT_SEGMENT else self._last_segment
@@ -226,12 +349,14 @@ class AppController(QObject):
                 path=self._context_path,
                 segment=segment,
             )
+            self._mark_context_dirty()
             self.avatar.speak(reply)
         else:
             self.avatar.show_message("I'm speechless!")
             self._auto_resume_listening()
 
     def _handle_reply_error(self, err: str) -> None:
+        self._reply_pending = False
         self.avatar.show_message(f"Reply error: {err}")
         if err:
             append_message(
@@ -241,21 +366,44 @@ class AppController(QObject):
                 path=self._context_path,
                 segment="system",
             )
+            self._mark_context_dirty()
         self._auto_resume_listening()
 
-    def _clear_reply_thread(self) -> None:
-        self._reply_thread = None
-
     def _auto_resume_listening(self) -> None:
         if not self._auto_listen_enabled:
             return
         if not self.toggle.mic_enabled:
             return
-        if self._reply_thread and self._reply_thread.isRunning():
+        if self._reply_pending:
             return
         # Give the UI a brief moment to settle before listening again
         QTimer.singleShot(350, self.avatar.listen)
 
+    # ------------------------------------------------------------------
+    # Context persistence
+    # ------------------------------------------------------------------
+    def _mark_context_dirty(self) -> None:
+        self._context_dirty = True
+        self._flush_timer.start()  # restarts the idle window on every append
+
+    def _flush_context(self) -> None:
+        if not self._context_dirty:
+            return
+        self._context_dirty = False
+        self._io_pool.start(partial(write_context_snapshot, tuple(self._conversation), path=self._context_path))
+
+    def _settle_context_writes(self) -> None:
+        # The caller saves the full conversation synchronously next, so a queued or
+        # in-flight snapshot write must not land after it with older messages
+        self._flush_timer.stop()
+        self._context_dirty = False
+        self._io_pool.waitForDone()
+
+    def _save_pending_context(self) -> None:
+        self._settle_context_writes()
+        # Compacts the sidecar and rewrites the snapshot if any append is still pending
+        flush_context()
+
     def _summarize_and_trim(self, assistant_reply: str) -> Optional[str]:
         append_message(
             self._conversation,
@@ -266,7 +414,9 @@ class AppController(QObject):
             segment=self._last_segment,
         )
         summary = summarize_history(self._conversation)
+        self._settle_context_writes()
         if summary:
+            self._recent_tail = list(self._conversation)
             self._conversation = [{"role": "assistant", "content": summary}]
             update_segment_summary(self._last_segment or DEFAULT_SEGMENT, summary)
             save_context(self._conversation, path=self._context_path)
@@ -282,32 +432,34 @@ class AppController(QObject):
 
     def _trigger_obsidian_export_internal(self, *, blocking: bool) -> None:
         if blocking:
-            if self._obsidian_thread and self._obsidian_thread.is_alive():
-                self._obsidian_thread.join(timeout=5)
-            self._obsidian_thread = None
+            # The rebuild below covers anything still pending; stop the worker first so
+            # the two never write the vault at once
             try:
-                rebuild_obsidian_vault()
-            except Exception:
+                self._export_queue.get_nowait()
+            except queue.Empty:
                 pass
+            self._export_queue.put_nowait(_EXPORT_STOP)
+            self._export_thread.join(timeout=5)
+            self._export_vault()
             return
 
-        if self._obsidian_thread and self._obsidian_thread.is_alive():
-            return
+        try:
+            self._export_queue.put_nowait(True)
+        except queue.Full:
+            pass  # a rebuild is already pending and will include this turn
 
-        def _run_export() -> None:
-            try:
-                rebuild_obsidian_vault()
-            except Exception:
-                pass
-            finally:
-                self._obsidian_thread = None
+    def _export_loop(self) -> None:
+        while self._export_queue.get() is not _EXPORT_STOP:
+            self._export_vault()
 
-        self._obsidian_thread = threading.Thread(
-            target=_run_export,
-            name="ObsidianExport",
-            daemon=True,
-        )
-        self._obsidian_thread.start()
+    def _export_vault(self) -> None:
+        try:
+            flush_segment_writes(timeout=5)
+            changed = pop_changed_segments()
+            rebuild_obsidian_vault(None if self._vault_stale else changed)
+            self._vault_stale = False
+        except Exception:
+            self._vault_stale = True
 
     # ------------------------------------------------------------------
     # Safety toggles
@@ -319,7 +471,8 @@ class AppController(QObject):
     def _toggle_vision(self) -> None:
         self.toggle.toggle_vision()
         status = "on" if self.toggle.vision_enabled else "off"
-        if self.toggle.vision_enabled and not is_vision_ready():
+        # Switching vision on re-checks for Tesseract, so installing it needs no restart
+        if self.toggle.vision_enabled and not (is_vision_ready() or refresh_vision()):
             self.avatar.show_message(
                 "Vision needs Tesseract OCR. Install it (see README) or pick ‘Toggle screen vision’ to disable."
             )
@@ -327,10 +480,19 @@ class AppController(QObject):
             self.avatar.show_message(f"Screen vision {status}")
 
     def _finalize_conversation(self) -> None:
-        try:
-            summary = summarize_history(self._conversation)
-        except Exception:
-            summary = None
+        summary: Optional[str] = None
+        if self._context_summary is not None and self._conversation == [
+            {"role": "assistant", "content": self._context_summary}
+        ]:
+            # Already collapsed by bye/stop (or nothing said since launch): keep that
+            # summary and the turns it replaced instead of summarizing the summary
+            recent_turns = self._recent_tail
+        else:
+            recent_turns = list(self._conversation)
+            try:
+                summary = summarize_history(self._conversation)
+            except Exception:
+                summary = None
         if summary:
             try:
                 update_segment_summary(self._last_segment or DEFAULT_SEGMENT, summary)
@@ -338,18 +500,20 @@ class AppController(QObject):
                 pass
             self._conversation = [{"role": "assistant", "content": summary}]
             self._context_summary = summary
+        self._settle_context_writes()
         try:
             save_context(self._conversation, path=self._context_path)
         except Exception:
             pass
+        save_warm_state(self._context_summary, recent_turns, path=self._context_path)
 
     def _handle_shutdown_request(self) -> None:
         if self._shutdown_in_progress:
             return
         self._shutdown_in_progress = True
         self._auto_listen_enabled = False
-        if self._reply_thread and self._reply_thread.isRunning():
-            self._reply_thread.wait(2000)
+        if self._reply_pending:
+            self._pool.waitForDone(2000)
         self.avatar.speak("Saving notes. One moment…")
         self._finalize_conversation()
         self._trigger_obsidian_export_internal(blocking=True)
@@ -1,15 +1,116 @@
+import json
+import logging
+import os
+import sys
+
 import speech_recognition as sr
 
+try:
+    import vosk
+except Exception:  # pragma: no cover - optional offline streaming recognizer
+    vosk = None
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pc_avatar.session_commands import SESSION_CONTROL_KEYWORDS
+else:
+    from .session_commands import SESSION_CONTROL_KEYWORDS
+
+_LOG = logging.getLogger(__name__)
+
+STREAM_PHRASE_LIMIT = 30.0  # seconds of audio before a streamed phrase is cut off
+# Vosk keeps short, confident phrases; longer or shakier ones go to Google for accuracy
+LOCAL_MAX_SECONDS = 2.0
+LOCAL_MIN_CONFIDENCE = 0.85
+
 recognizer = sr.Recognizer()
+# End the one-shot phrase after a shorter pause than the 0.8 s default; listen() asserts
+# pause_threshold >= non_speaking_duration (0.5 by default), so lower both together
+recognizer.pause_threshold = 0.4
+recognizer.non_speaking_duration = 0.3
 mic = sr.Microphone()
 
-def listen_for_speech():
+_vosk_model = None  # False once loading failed, so the download is not retried per phrase
+
+
+def _load_vosk_model():
+    global _vosk_model
+    if _vosk_model is None:
+        _vosk_model = False
+        if vosk is not None:
+            try:
+                model_path = os.environ.get("NOVA_VOSK_MODEL")
+                _vosk_model = vosk.Model(model_path) if model_path else vosk.Model(lang="en-us")
+            except Exception:  # pragma: no cover - model missing or download failed
+                pass
+    return _vosk_model or None
+
+
+def _stream_with_vosk(model, on_partial):
+    """Feed ~100 ms microphone frames to Vosk until it detects the end of the phrase.
+
+    Returns ``(text, confidence, audio)``: the mean per-word confidence and the
+    captured audio, so the caller can escalate the phrase to a remote recognizer.
+    """
+
+    with mic as source:
+        _LOG.debug("Listening...")
+        kaldi = vosk.KaldiRecognizer(model, source.SAMPLE_RATE)
+        kaldi.SetWords(True)  # per-word "conf" in the final result
+        frames_per_read = max(source.CHUNK, source.SAMPLE_RATE // 10)
+        max_reads = int(STREAM_PHRASE_LIMIT * source.SAMPLE_RATE / frames_per_read)
+        frames = []
+        last_partial = ""
+        for _ in range(max_reads):
+            frame = source.stream.read(frames_per_read)
+            frames.append(frame)
+            if kaldi.AcceptWaveform(frame):
+                break
+            partial = json.loads(kaldi.PartialResult()).get("partial", "")
+            if on_partial is not None and partial and partial != last_partial:
+                last_partial = partial
+                on_partial(partial)
+        result = json.loads(kaldi.FinalResult())
+        audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    words = result.get("result") or []
+    confidence = sum(word.get("conf", 0.0) for word in words) / len(words) if words else 0.0
+    return result.get("text", "").strip() or None, confidence, audio
+
+
+def _keep_local(text, confidence, audio):
+    if text in SESSION_CONTROL_KEYWORDS:
+        return True
+    seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+    return confidence >= LOCAL_MIN_CONFIDENCE and seconds <= LOCAL_MAX_SECONDS
+
+
+def listen_for_speech(on_partial=None):
+    """Return the next phrase; ``on_partial(text)`` receives hypotheses while it is spoken.
+
+    Partials need Vosk (``pip install vosk``). Its transcript is returned directly
+    for session commands and short, confident phrases; anything else is re-run
+    through Google. Without Vosk this falls back to one blocking ``listen``
+    followed by Google recognition.
+    """
+
+    model = _load_vosk_model()
+    if model is not None:
+        text, confidence, audio = _stream_with_vosk(model, on_partial)
+        if text and not _keep_local(text, confidence, audio):
+            try:
+                text = recognizer.recognize_google(audio)
+            except (sr.UnknownValueError, sr.RequestError):
+                pass  # keep the local transcript
+        if text:
+            _LOG.debug("You: %s", text)
+        return text
+
     with mic as source:
-        print("🎧 Listening...")
+        _LOG.debug("Listening...")
         audio = recognizer.listen(source)
     try:
         text = recognizer.recognize_google(audio)
-        print("You:", text)
+        _LOG.debug("You: %s", text)
         return text
     except sr.UnknownValueError:
         return None
@@ -1,3 +1,8 @@
+import logging
+
+_LOG = logging.getLogger(__name__)
+
+
 class SafetyToggle:
     def __init__(self):
         self.vision_enabled = True
@@ -5,8 +10,8 @@ class SafetyToggle:
 
     def toggle_vision(self):
         self.vision_enabled = not self.vision_enabled
-        print("Vision:", "ON" if self.vision_enabled else "OFF")
+        _LOG.debug("Vision: %s", "ON" if self.vision_enabled else "OFF")
 
     def toggle_mic(self):
         self.mic_enabled = not self.mic_enabled
-        print("Mic:", "ON" if self.mic_enabled else "OFF")
+        _LOG.debug("Mic: %s", "ON" if self.mic_enabled else "OFF")
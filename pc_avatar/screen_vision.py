@@ -1,33 +1,42 @@
+import hashlib
 import os
 import shutil
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import pyautogui
 
 try:
-    from PIL import ImageGrab  # type: ignore
+    from PIL import Image, ImageGrab  # type: ignore
 except Exception:  # pragma: no cover - optional dependency issues
+    Image = None  # type: ignore
     ImageGrab = None  # type: ignore
 
+try:
+    import mss
+except Exception:  # pragma: no cover - optional faster screen grabber
+    mss = None
+
 try:
     import pytesseract
 except ImportError:  # pragma: no cover - optional dependency
     pytesseract = None  # type: ignore[assignment]
 
 
-_POSSIBLE_TESSERACT_PATHS = [
-    os.environ.get("TESSERACT_PATH"),
-    shutil.which("tesseract"),
-    r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe",
-    r"C:\\Program Files (x86)\\Tesseract-OCR\\tesseract.exe",
-]
+def _possible_tesseract_paths() -> List[Optional[str]]:
+    # Evaluated per resolution so refresh_vision() sees a fresh install or PATH change
+    return [
+        os.environ.get("TESSERACT_PATH"),
+        shutil.which("tesseract"),
+        r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe",
+        r"C:\\Program Files (x86)\\Tesseract-OCR\\tesseract.exe",
+    ]
 
 
 def _resolve_tesseract_cmd() -> Optional[str]:
     if pytesseract is None:
         return None
 
-    for candidate in _POSSIBLE_TESSERACT_PATHS:
+    for candidate in _possible_tesseract_paths():
         if candidate and os.path.exists(candidate):
             pytesseract.pytesseract.tesseract_cmd = candidate
             return candidate
@@ -40,12 +49,44 @@ def _resolve_tesseract_cmd() -> Optional[str]:
 
 
 _TESSERACT_CMD = _resolve_tesseract_cmd()
+# Checked on every voice turn; only refresh_vision() changes it
+_VISION_READY = pytesseract is not None and _TESSERACT_CMD is not None
+
+# UI text stays legible at this size; larger captures mostly cost OCR time
+OCR_MAX_SIDE = 1600
+# LSTM engine only, one uniform text block: skips the legacy engine and layout passes
+OCR_CONFIG = "--oem 1 --psm 6"
+# A hung Tesseract is killed after this long and the turn goes ahead without the screen
+OCR_TIMEOUT_S = 4.0
+
+# (digest of the prepared capture, OCR text) from the previous call
+_last_ocr: Optional[Tuple[bytes, str]] = None
 
 
 def is_vision_ready() -> bool:
     """Return True when pytesseract and the Tesseract binary are available."""
 
-    return pytesseract is not None and _TESSERACT_CMD is not None
+    return _VISION_READY
+
+
+def refresh_vision() -> bool:
+    """Look for the Tesseract binary again (e.g. after installing it) and return readiness."""
+
+    global _TESSERACT_CMD, _VISION_READY
+    _TESSERACT_CMD = _resolve_tesseract_cmd()
+    _VISION_READY = pytesseract is not None and _TESSERACT_CMD is not None
+    return _VISION_READY
+
+
+def warm_up_ocr() -> None:
+    """OCR a blank tile once so the Tesseract binary and language data are cached."""
+
+    if not is_vision_ready() or Image is None:
+        return
+    try:
+        pytesseract.image_to_string(Image.new("L", (64, 32), 255), config=OCR_CONFIG)
+    except Exception:  # pragma: no cover - the first real capture reports errors
+        pass
 
 
 def get_screen_text() -> Optional[str]:
@@ -57,18 +98,49 @@ def get_screen_text() -> Optional[str]:
     if not is_vision_ready():
         return None
 
-    screenshot = _capture_full_desktop()
+    global _last_ocr
+    image = _prepare_for_ocr(_capture_full_desktop())
+    digest = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+    cached = _last_ocr
+    if cached is not None and cached[0] == digest:
+        return cached[1]  # screen unchanged since the last turn
     try:
-        return pytesseract.image_to_string(screenshot)
+        text = pytesseract.image_to_string(image, config=OCR_CONFIG, timeout=OCR_TIMEOUT_S)
     except pytesseract.pytesseract.TesseractNotFoundError:  # pragma: no cover - runtime env issue
         return None
+    except RuntimeError:  # pragma: no cover - pytesseract's "Tesseract process timeout"
+        return None
     except OSError:  # pragma: no cover - surrogate for other OS-level issues
         return None
+    _last_ocr = (digest, text)
+    return text
+
+
+def _prepare_for_ocr(screenshot):
+    """Grayscale and cap the longest side at OCR_MAX_SIDE before handing off to Tesseract."""
+
+    image = screenshot.convert("L")
+    width, height = image.size
+    scale = OCR_MAX_SIDE / max(width, height, 1)
+    if scale < 1:
+        # Image is importable whenever a capture exists: pyautogui screenshots via Pillow
+        image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.BILINEAR)
+    return image
 
 
 def _capture_full_desktop():
     """Grab a screenshot spanning all monitors when supported."""
 
+    if mss is not None and Image is not None:
+        try:
+            # monitors[0] is the bounding box of every display; Pillow decodes the raw
+            # BGRA buffer in C, skipping the extra copies ``shot.bgra``/``shot.rgb`` make
+            with mss.mss() as grabber:
+                shot = grabber.grab(grabber.monitors[0])
+            return Image.frombuffer("RGB", shot.size, shot.raw, "raw", "BGRX", 0, 1)
+        except Exception:
+            pass
+
     try:
         return pyautogui.screenshot(allScreens=True)
     except TypeError:
@@ -0,0 +1,5 @@
+BYE_KEYWORDS = {"bye", "bye nova"}
+STOP_KEYWORDS = {"stop", "stop nova"}
+# Phrases that end or pause a session: segmented as session-control and always
+# recognised locally, never sent over the network
+SESSION_CONTROL_KEYWORDS = BYE_KEYWORDS | STOP_KEYWORDS | {"goodbye", "see you", "later nova"}